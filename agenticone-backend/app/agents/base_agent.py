@@ -131,7 +131,7 @@ class BaseAgent(ABC):
         """Get previous analyses for the same document"""
         try:
             analyses = await db_client.get_analyses_by_document(document_id)
-            return [analysis.dict() for analysis in analyses]
+            return [analysis.model_dump() for analysis in analyses]
         except Exception as e:
             raise ValueError(f"Failed to get previous analyses: {str(e)}")
     
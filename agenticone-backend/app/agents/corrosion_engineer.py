@@ -64,7 +64,7 @@ class CorrosionEngineer(BaseAgent):
                 "document_id": document_id,
                 "agent_type": "corrosion_engineer",
                 "analysis_type": analysis_type,
-                "results": [result.dict() for result in results],
+                "results": [result.model_dump() for result in results],
                 "confidence": processed_results["confidence"],
                 "recommendations": processed_results["recommendations"]
             })
@@ -73,7 +73,7 @@ class CorrosionEngineer(BaseAgent):
             
             return {
                 "analysis_id": analysis_id,
-                "results": [result.dict() for result in results],
+                "results": [result.model_dump() for result in results],
                 "confidence": processed_results["confidence"],
                 "recommendations": processed_results["recommendations"]
             }
@@ -60,7 +60,7 @@ class DisciplineHead(BaseAgent):
                 "document_id": document_id,
                 "agent_type": "discipline_head",
                 "analysis_type": analysis_type,
-                "results": [result.dict() for result in results],
+                "results": [result.model_dump() for result in results],
                 "confidence": processed_results["confidence"],
                 "recommendations": processed_results["recommendations"]
             })
@@ -69,7 +69,7 @@ class DisciplineHead(BaseAgent):
             
             return {
                 "analysis_id": analysis_id,
-                "results": [result.dict() for result in results],
+                "results": [result.model_dump() for result in results],
                 "confidence": processed_results["confidence"],
                 "recommendations": processed_results["recommendations"]
             }
@@ -3,7 +3,7 @@ Chat Integration API Endpoints
 Handles chat conversation capture and report generation from conversations
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Form
+from fastapi import APIRouter, Depends, HTTPException, Form, Query
 from typing import List, Dict, Any, Optional
 import json
 
@@ -11,6 +11,9 @@ from app.services.chat_integration_service import ChatIntegrationService
 
 router = APIRouter(prefix="/api/chat", tags=["Chat Integration"])
 
+# Largest page of conversations one request may ask for
+MAX_CONVERSATIONS_PAGE_SIZE = 200
+
 def get_chat_integration_service() -> ChatIntegrationService:
     return ChatIntegrationService()
 
@@ -70,16 +73,20 @@ async def generate_report_from_conversation(
 
 @router.get("/conversations")
 async def list_conversations(
+    limit: int = Query(50, ge=1, le=MAX_CONVERSATIONS_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
     chat_service: ChatIntegrationService = Depends(get_chat_integration_service)
 ):
-    """List all captured conversations"""
+    """List captured conversations, newest first, one page at a time"""
     try:
-        conversations = await chat_service.list_conversations()
+        conversations = await chat_service.list_conversations(limit=limit, offset=offset)
         
         return {
             "status": "success",
             "conversations": conversations,
-            "count": len(conversations)
+            "count": len(conversations),
+            "limit": limit,
+            "offset": offset
         }
         
     except Exception as e:
@@ -217,7 +217,7 @@ async def get_document_details(document_id: str) -> Dict[str, Any]:
         
         return {
             "status": "success",
-            "document": document.dict() if hasattr(document, 'dict') else document
+            "document": document.model_dump() if hasattr(document, 'model_dump') else document
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
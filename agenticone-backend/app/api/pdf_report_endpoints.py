@@ -4,15 +4,24 @@ Handles specialist PDF report generation without Vertex AI dependency
 """
 
 from fastapi import APIRouter, Depends, HTTPException, Form, File, UploadFile
-from fastapi.responses import FileResponse, StreamingResponse
+from fastapi.responses import FileResponse, ORJSONResponse, StreamingResponse
 from typing import List, Dict, Any, Optional
 import json
+import logging
 import os
+from datetime import datetime
 from pathlib import Path
 
 from app.services.pdf_report_generator import PDFReportGenerator
+from app.models.schemas import ReportListResponse
 
-router = APIRouter(prefix="/api/pdf-reports", tags=["PDF Reports"])
+logger = logging.getLogger(__name__)
+
+router = APIRouter(
+    prefix="/api/pdf-reports",
+    tags=["PDF Reports"],
+    default_response_class=ORJSONResponse
+)
 
 def get_pdf_report_generator() -> PDFReportGenerator:
     return PDFReportGenerator()
@@ -33,11 +42,10 @@ async def generate_specialist_pdf_report(
         except json.JSONDecodeError:
             parsed_analysis_data = {"findings": [analysis_data], "recommendations": []}
         
-        print(f"📄 PDF Report generation request:")
-        print(f"   - Specialist: {specialist_type}")
-        print(f"   - Customer Request: {customer_request}")
-        print(f"   - Analysis Data: {parsed_analysis_data}")
-        print(f"   - User Email: {user_email}")
+        logger.debug(
+            "PDF report generation request: specialist=%s email=%s",
+            specialist_type, user_email
+        )
         
         # Generate PDF report
         report = await pdf_report_generator.generate_specialist_pdf_report(
@@ -54,7 +62,7 @@ async def generate_specialist_pdf_report(
         }
         
     except Exception as e:
-        print(f"❌ PDF Report generation error: {e}")
+        logger.error("PDF Report generation error: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to generate PDF report: {str(e)}")
 
 @router.get("/download/{report_id}")
@@ -83,26 +91,30 @@ async def download_pdf_report(
         )
         
     except Exception as e:
-        print(f"❌ PDF download error: {e}")
+        logger.error("PDF download error: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to download PDF: {str(e)}")
 
-@router.get("/list")
+@router.get("/list", response_model=ReportListResponse)
 async def list_pdf_reports(
     pdf_report_generator: PDFReportGenerator = Depends(get_pdf_report_generator)
 ):
     """List all available PDF reports"""
     try:
         reports_dir = Path("reports")
-        pdf_files = list(reports_dir.glob("*.pdf"))
         
         reports = []
-        for pdf_file in pdf_files:
-            reports.append({
-                "filename": pdf_file.name,
-                "path": str(pdf_file),
-                "size": pdf_file.stat().st_size,
-                "created": datetime.fromtimestamp(pdf_file.stat().st_ctime).isoformat()
-            })
+        # scandir entries carry the file type from readdir, so only matches get stat'ed
+        with os.scandir(reports_dir) as entries:
+            for entry in entries:
+                if not entry.name.endswith(".pdf") or not entry.is_file():
+                    continue
+                stat = entry.stat()
+                reports.append({
+                    "filename": entry.name,
+                    "path": str(reports_dir / entry.name),
+                    "size": stat.st_size,
+                    "created": datetime.fromtimestamp(stat.st_ctime)
+                })
         
         return {
             "status": "success",
@@ -111,7 +123,7 @@ async def list_pdf_reports(
         }
         
     except Exception as e:
-        print(f"❌ PDF list error: {e}")
+        logger.error("PDF list error: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to list PDF reports: {str(e)}")
 
 @router.delete("/delete/{report_id}")
@@ -140,5 +152,5 @@ async def delete_pdf_report(
             raise HTTPException(status_code=404, detail="PDF file not found")
         
     except Exception as e:
-        print(f"❌ PDF deletion error: {e}")
+        logger.error("PDF deletion error: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to delete PDF report: {str(e)}")
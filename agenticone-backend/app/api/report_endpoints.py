@@ -4,16 +4,27 @@ Handles specialist report generation and PDF conversion
 """
 
 from fastapi import APIRouter, Depends, HTTPException, Form, File, UploadFile
-from fastapi.responses import FileResponse, HTMLResponse
+from fastapi.responses import FileResponse, ORJSONResponse
 from typing import List, Dict, Any, Optional
 import json
+import logging
 import os
 from pathlib import Path
 
 from app.services.report_generator import ReportGenerator
 from app.services.vertex_ai_service import VertexAIService
+from app.models.schemas import ReportListResponse
 
-router = APIRouter(prefix="/api/reports", tags=["Reports"])
+logger = logging.getLogger(__name__)
+
+# Only this much of an uploaded text file is sent for AI analysis
+MAX_UPLOAD_ANALYSIS_BYTES = 100_000
+
+router = APIRouter(
+    prefix="/api/reports",
+    tags=["Reports"],
+    default_response_class=ORJSONResponse
+)
 
 def get_report_generator() -> ReportGenerator:
     return ReportGenerator()
@@ -37,11 +48,10 @@ async def generate_specialist_report(
         except json.JSONDecodeError:
             parsed_analysis_data = {"findings": [analysis_data], "recommendations": []}
         
-        print(f"📊 Report generation request:")
-        print(f"   - Specialist: {specialist_type}")
-        print(f"   - Customer Request: {customer_request}")
-        print(f"   - Analysis Data: {parsed_analysis_data}")
-        print(f"   - User Email: {user_email}")
+        logger.debug(
+            "Report generation request: specialist=%s email=%s",
+            specialist_type, user_email
+        )
         
         # Generate report
         report = await report_generator.generate_specialist_report(
@@ -91,7 +101,8 @@ async def generate_report_from_upload(
                 # Analyze document content if it's text-based
                 if file.content_type and file.content_type.startswith('text/'):
                     try:
-                        text_content = content.decode('utf-8')
+                        # Decode only the analysed prefix rather than the whole upload
+                        text_content = content[:MAX_UPLOAD_ANALYSIS_BYTES].decode('utf-8', errors='replace')
                         # Use Vertex AI to analyze the content
                         ai_analysis = await vertex_ai_service.analyze_document(
                             text_content, 
@@ -118,7 +129,7 @@ async def generate_report_from_upload(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to generate report from uploads: {str(e)}")
 
-@router.get("/list")
+@router.get("/list", response_model=ReportListResponse)
 async def list_available_reports(
     report_generator: ReportGenerator = Depends(get_report_generator)
 ):
@@ -163,9 +174,8 @@ async def preview_report(filename: str):
             raise HTTPException(status_code=404, detail="Report file not found")
         
         if filename.endswith('.html'):
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            return HTMLResponse(content=content)
+            # Streamed from disk in chunks and rendered inline (no download filename)
+            return FileResponse(path=str(file_path), media_type='text/html')
         else:
             return FileResponse(
                 path=str(file_path),
@@ -1,9 +1,10 @@
 """
 Configuration management for AgenticOne Backend
 """
-import os
+from functools import cached_property, lru_cache
 from typing import List, Optional
-from pydantic_settings import BaseSettings
+from pydantic import computed_field
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
     """Application settings"""
@@ -16,44 +17,62 @@ class Settings(BaseSettings):
     # CORS Configuration
     ALLOWED_ORIGINS: str = "http://localhost:3000,http://localhost:5173,https://agenticone.vercel.app"
     
+    @computed_field
+    @cached_property
+    def allowed_origins_list(self) -> List[str]:
+        """ALLOWED_ORIGINS split once into a list, empty entries dropped"""
+        return [origin.strip() for origin in self.ALLOWED_ORIGINS.split(",") if origin.strip()]
+    
     # Google Cloud Configuration
-    GOOGLE_CLOUD_PROJECT: str = os.getenv("GOOGLE_CLOUD_PROJECT", "")
-    GOOGLE_APPLICATION_CREDENTIALS: str = os.getenv("GOOGLE_APPLICATION_CREDENTIALS", "")
+    GOOGLE_CLOUD_PROJECT: str = ""
+    GOOGLE_APPLICATION_CREDENTIALS: str = ""
     
     # Vertex AI Configuration
-    VERTEX_AI_LOCATION: str = os.getenv("VERTEX_AI_LOCATION", "us-central1")
-    VERTEX_AI_MODEL: str = os.getenv("VERTEX_AI_MODEL", "gemini-1.5-pro")
+    VERTEX_AI_LOCATION: str = "us-central1"
+    VERTEX_AI_MODEL: str = "gemini-1.5-pro"
     
     # Vector Search Configuration
-    VECTOR_SEARCH_INDEX_ID: str = os.getenv("VECTOR_SEARCH_INDEX_ID", "")
-    VECTOR_SEARCH_DIMENSIONS: int = int(os.getenv("VECTOR_SEARCH_DIMENSIONS", "768"))
+    VECTOR_SEARCH_INDEX_ID: str = ""
+    VECTOR_SEARCH_DIMENSIONS: int = 768
     
     # Firestore Configuration
-    FIRESTORE_PROJECT_ID: str = os.getenv("FIRESTORE_PROJECT_ID", "")
-    FIRESTORE_DATABASE_ID: str = os.getenv("FIRESTORE_DATABASE_ID", "(default)")
+    FIRESTORE_PROJECT_ID: str = ""
+    FIRESTORE_DATABASE_ID: str = "(default)"
     
     # Cloud Storage Configuration
-    CLOUD_STORAGE_BUCKET: str = os.getenv("CLOUD_STORAGE_BUCKET", "")
+    CLOUD_STORAGE_BUCKET: str = ""
+    
+    # Server Configuration
+    WORKERS: int = 0  # 0 = one worker per CPU
     
     # Agent Configuration
-    MAX_ANALYSIS_RETRIES: int = int(os.getenv("MAX_ANALYSIS_RETRIES", "3"))
-    ANALYSIS_TIMEOUT: int = int(os.getenv("ANALYSIS_TIMEOUT", "300"))  # 5 minutes
+    MAX_ANALYSIS_RETRIES: int = 3
+    ANALYSIS_TIMEOUT: int = 300  # 5 minutes
+    MAX_CONCURRENT_AGENT_CALLS: int = 8
+    AGENT_SLOT_TIMEOUT_S: float = 10.0  # wait for a free slot before answering 503
+    
+    # Document Processing
+    PDF_PARSE_WORKERS: int = 0  # 0 = one process per CPU
     
     # Report Generation
-    REPORT_TEMPLATE_PATH: str = os.getenv("REPORT_TEMPLATE_PATH", "templates/")
-    REPORT_OUTPUT_PATH: str = os.getenv("REPORT_OUTPUT_PATH", "reports/")
+    REPORT_TEMPLATE_PATH: str = "templates/"
+    REPORT_OUTPUT_PATH: str = "reports/"
     
     # Security
-    SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-here")
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+    SECRET_KEY: str = "your-secret-key-here"
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     
     # Logging
-    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "text"  # "text" or "json"
     
-    class Config:
-        env_file = ".env"
-        case_sensitive = True
-        extra = "ignore"  # Ignore extra fields from .env
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        case_sensitive=True,
+        extra="ignore"  # Ignore extra fields from .env
+    )
 
-# Global settings instance
-settings = Settings()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Return the process-wide settings, loading them on first use"""
+    return Settings()
@@ -1,24 +1,28 @@
 """
 FastAPI main application for AgenticOne Backend
 """
-from fastapi import FastAPI, HTTPException, Depends
+import os
+import logging
+import asyncio
+import hashlib
+import orjson
+from fastapi import FastAPI, HTTPException, Depends, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 import uvicorn
+from typing import Any, Dict, List, Union
 from contextlib import asynccontextmanager
 
-from app.config import settings
-from app.agents.discipline_head import DisciplineHead
-from app.agents.methods_specialist import MethodsSpecialist
-from app.agents.corrosion_engineer import CorrosionEngineer
-from app.agents.subsea_engineer import SubseaEngineer
-from app.services.rag_service import RAGService
-from app.services.vision_service import VisionService
-from app.services.report_generator import ReportGenerator
+from app.config import get_settings
+from app.utils.helpers import setup_logging
+from app.services.document_processor import shutdown_pdf_pool
 from app.models.schemas import (
     AnalysisRequest,
     AnalysisResponse,
+    BatchRequest,
+    BatchSubRequest,
     DocumentUpload,
+    MultiAgentAnalysisResponse,
     ReportRequest,
     ReportResponse
 )
@@ -31,68 +35,169 @@ from app.api.enhanced_chat_endpoints import router as enhanced_chat_router
 from app.api.document_analysis_endpoints import router as document_analysis_router
 from app.api.agent_evaluation_endpoints import router as evaluation_router
 
-# Global services
-rag_service = None
-vision_service = None
-report_generator = None
-agents = {}
+settings = get_settings()
+setup_logging(settings.LOG_LEVEL, settings.LOG_FORMAT)
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on sub-requests accepted by /batch
+MAX_BATCH_REQUESTS = 20
+
+# Static agent catalogue served by /agents, built once at import
+AGENTS_INFO = {
+    "agents": {
+        "discipline_head": {
+            "name": "Discipline Head",
+            "description": "Overall project coordination and decision making",
+            "capabilities": ["project_oversight", "decision_making", "coordination"]
+        },
+        "methods_specialist": {
+            "name": "Methods Specialist",
+            "description": "Specialized in engineering methods and procedures",
+            "capabilities": ["method_analysis", "procedure_optimization", "best_practices"]
+        },
+        "corrosion_engineer": {
+            "name": "Corrosion Engineer",
+            "description": "Expert in corrosion analysis and prevention",
+            "capabilities": ["corrosion_analysis", "material_selection", "prevention_strategies"]
+        },
+        "subsea_engineer": {
+            "name": "Subsea Engineer",
+            "description": "Specialized in subsea systems and operations",
+            "capabilities": ["subsea_systems", "underwater_operations", "marine_engineering"]
+        }
+    }
+}
+
+# Cache lifetimes (seconds) advertised on the cheap GET endpoints
+AGENTS_CACHE_MAX_AGE = 300
+PROBE_CACHE_MAX_AGE = 30
+
+def _etag(body: bytes) -> str:
+    """Strong ETag derived from the response body"""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+def _cacheable_json(request: Request, body: bytes, etag: str, max_age: int) -> Response:
+    """Serve a pre-serialised JSON body, answering 304 when the client's ETag matches"""
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={max_age}"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if if_none_match.strip() == "*" or etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
+AGENTS_INFO_JSON = orjson.dumps(AGENTS_INFO)
+AGENTS_INFO_ETAG = _etag(AGENTS_INFO_JSON)
+
+ROOT_JSON = orjson.dumps({"message": "AgenticOne Backend API", "status": "healthy"})
+ROOT_ETAG = _etag(ROOT_JSON)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Application lifespan manager"""
-    global rag_service, vision_service, report_generator, agents
+    """Application lifespan manager
+
+    Initialisation errors propagate so a misconfigured worker exits at startup
+    (and is restarted by the orchestrator) instead of serving requests with
+    missing services.
+    """
+    # Imported here so workers only pay for the agent/service stack at startup
+    from app.agents.discipline_head import DisciplineHead
+    from app.agents.methods_specialist import MethodsSpecialist
+    from app.agents.corrosion_engineer import CorrosionEngineer
+    from app.agents.subsea_engineer import SubseaEngineer
+    from app.models.database import db_client
+    from app.services.rag_service import RAGService
+    from app.services.vision_service import VisionService
+    from app.services.report_generator import ReportGenerator
     
-    try:
-        # Initialize services one by one
-        print("🔄 Initializing RAG service...")
-        rag_service = RAGService()
-        print("✅ RAG service initialized")
-        
-        print("🔄 Initializing Vision service...")
-        vision_service = VisionService()
-        print("✅ Vision service initialized")
-        
-        print("🔄 Initializing Report generator...")
-        report_generator = ReportGenerator()
-        print("✅ Report generator initialized")
-        
-        # Initialize agents
-        print("🔄 Initializing agents...")
-        agents = {
-            "discipline_head": DisciplineHead(rag_service, vision_service),
-            "methods_specialist": MethodsSpecialist(rag_service, vision_service),
-            "corrosion_engineer": CorrosionEngineer(rag_service, vision_service),
-            "subsea_engineer": SubseaEngineer(rag_service, vision_service)
+    # Connect to Firestore now so the first request doesn't pay for auth and discovery
+    logger.info("🔄 Connecting to Firestore...")
+    await db_client.warm_up()
+    logger.info("✅ Firestore ready")
+    
+    # Initialize services one by one
+    logger.info("🔄 Initializing RAG service...")
+    rag_service = RAGService()
+    app.state.rag_service = rag_service
+    logger.info("✅ RAG service initialized")
+    
+    logger.info("🔄 Initializing Vision service...")
+    vision_service = VisionService()
+    app.state.vision_service = vision_service
+    logger.info("✅ Vision service initialized")
+    
+    logger.info("🔄 Initializing Report generator...")
+    app.state.report_generator = ReportGenerator()
+    logger.info("✅ Report generator initialized")
+    
+    # Initialize agents
+    logger.info("🔄 Initializing agents...")
+    app.state.agents = {
+        "discipline_head": DisciplineHead(rag_service, vision_service),
+        "methods_specialist": MethodsSpecialist(rag_service, vision_service),
+        "corrosion_engineer": CorrosionEngineer(rag_service, vision_service),
+        "subsea_engineer": SubseaEngineer(rag_service, vision_service)
+    }
+    # Bound in-flight LLM calls per agent so bursts queue instead of piling up
+    app.state.agent_semaphores = {
+        agent_type: asyncio.Semaphore(settings.MAX_CONCURRENT_AGENT_CALLS)
+        for agent_type in app.state.agents
+    }
+    logger.info("✅ All services and agents initialized successfully")
+    
+    # Service wiring is fixed for the worker's lifetime, so /health serves these bytes as-is
+    app.state.health_json = orjson.dumps({
+        "status": "healthy",
+        "services": {
+            "rag": True,
+            "vision": True,
+            "report_generator": True,
+            "agents": len(app.state.agents)
         }
-        print("✅ All services and agents initialized successfully")
-    except Exception as e:
-        print(f"⚠️ Warning: Some services could not be initialized: {e}")
-        import traceback
-        traceback.print_exc()
-        # Initialize with None values for development
-        rag_service = None
-        vision_service = None
-        report_generator = None
-        agents = {}
+    })
+    app.state.health_etag = _etag(app.state.health_json)
     
     yield
     
     # Cleanup
-    if rag_service:
-        await rag_service.close()
+    await rag_service.close()
+    shutdown_pdf_pool()
+
+class OriginSetCORSMiddleware(CORSMiddleware):
+    """CORSMiddleware that checks origins against a frozenset instead of scanning a list"""
+    
+    def __init__(self, app, **kwargs):
+        super().__init__(app, **kwargs)
+        self.allow_origins = frozenset(self.allow_origins)
+
+def get_agents(request: Request) -> Dict[str, Any]:
+    """Agents built during lifespan for this worker"""
+    return request.app.state.agents
+
+def get_rag_service(request: Request) -> Any:
+    """RAG service built during lifespan for this worker"""
+    return request.app.state.rag_service
+
+def get_vision_service(request: Request) -> Any:
+    """Vision service built during lifespan for this worker"""
+    return request.app.state.vision_service
+
+def get_report_generator(request: Request) -> Any:
+    """Report generator built during lifespan for this worker"""
+    return request.app.state.report_generator
 
 # Create FastAPI app
 app = FastAPI(
     title="AgenticOne Backend",
     description="AI-powered engineering analysis platform",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware
-allowed_origins = [origin.strip() for origin in settings.ALLOWED_ORIGINS.split(",")]
+allowed_origins = settings.allowed_origins_list
 app.add_middleware(
-    CORSMiddleware,
+    OriginSetCORSMiddleware,
     allow_origins=allowed_origins,
     allow_credentials=True,
     allow_methods=["*"],
@@ -120,49 +225,94 @@ app.include_router(document_analysis_router)
 app.include_router(evaluation_router)
 
 @app.get("/")
-async def root():
+async def root(request: Request):
     """Health check endpoint"""
-    return {"message": "AgenticOne Backend API", "status": "healthy"}
+    return _cacheable_json(request, ROOT_JSON, ROOT_ETAG, PROBE_CACHE_MAX_AGE)
 
 @app.get("/health")
-async def health_check():
-    """Detailed health check"""
-    return {
-        "status": "healthy",
-        "services": {
-            "rag": rag_service is not None,
-            "vision": vision_service is not None,
-            "report_generator": report_generator is not None,
-            "agents": len(agents) if agents else 0
-        }
-    }
+async def health_check(request: Request):
+    """Detailed health check; 503 until startup has finished"""
+    state = request.app.state
+    if getattr(state, "health_json", None) is None:
+        return ORJSONResponse({"status": "starting"}, status_code=503)
+    return _cacheable_json(request, state.health_json, state.health_etag, PROBE_CACHE_MAX_AGE)
+
+@asynccontextmanager
+async def _agent_slot(request: Request, agent_type: str):
+    """Hold one of an agent's concurrency slots, answering 503 if none frees up in time"""
+    semaphore = request.app.state.agent_semaphores[agent_type]
+    try:
+        await asyncio.wait_for(semaphore.acquire(), settings.AGENT_SLOT_TIMEOUT_S)
+    except asyncio.TimeoutError:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Agent {agent_type} is busy, please retry",
+            headers={"Retry-After": "1"}
+        )
+    try:
+        yield
+    finally:
+        semaphore.release()
+
+def _to_analysis_response(agent_type: str, result: Dict[str, Any]) -> AnalysisResponse:
+    """Wrap one agent's analysis result in the response schema"""
+    return AnalysisResponse(
+        analysis_id=result["analysis_id"],
+        agent_type=agent_type,
+        results=result["results"],
+        confidence=result["confidence"],
+        recommendations=result["recommendations"]
+    )
 
-@app.post("/analyze", response_model=AnalysisResponse)
-async def analyze_document(request: AnalysisRequest):
+@app.post("/analyze", response_model=Union[AnalysisResponse, MultiAgentAnalysisResponse])
+async def analyze_document(
+    request: AnalysisRequest,
+    http_request: Request,
+    agents: Dict[str, Any] = Depends(get_agents)
+):
     """Analyze document using specialized agents"""
     try:
+        if request.agent_types:
+            # Agent calls are I/O bound, so run them concurrently in one round trip
+            agent_types = list(dict.fromkeys(t.value for t in request.agent_types))
+            unknown = [t for t in agent_types if t not in agents]
+            if unknown:
+                raise HTTPException(status_code=400, detail=f"Unknown agent types: {unknown}")
+            
+            async def run_agent(agent_type: str) -> Dict[str, Any]:
+                async with _agent_slot(http_request, agent_type):
+                    return await agents[agent_type].analyze(
+                        request.document_id, request.analysis_type, request.parameters
+                    )
+            
+            results = await asyncio.gather(*[run_agent(t) for t in agent_types])
+            
+            return MultiAgentAnalysisResponse(
+                analyses=[_to_analysis_response(t, r) for t, r in zip(agent_types, results)]
+            )
+        
         # Route to appropriate agent based on document type or analysis type
         agent_type = request.agent_type or "discipline_head"
         
-        if agent_type not in agents:
+        agent = agents.get(agent_type)
+        if agent is None:
             raise HTTPException(status_code=400, detail=f"Unknown agent type: {agent_type}")
         
-        agent = agents[agent_type]
-        result = await agent.analyze(request.document_id, request.analysis_type, request.parameters)
+        async with _agent_slot(http_request, agent_type):
+            result = await agent.analyze(request.document_id, request.analysis_type, request.parameters)
         
-        return AnalysisResponse(
-            analysis_id=result["analysis_id"],
-            agent_type=agent_type,
-            results=result["results"],
-            confidence=result["confidence"],
-            recommendations=result["recommendations"]
-        )
+        return _to_analysis_response(agent_type, result)
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/upload", response_model=dict)
-async def upload_document(document: DocumentUpload):
+async def upload_document(
+    document: DocumentUpload,
+    rag_service: Any = Depends(get_rag_service)
+):
     """Upload and process document"""
     try:
         # Process document through RAG service
@@ -181,8 +331,36 @@ async def upload_document(document: DocumentUpload):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/upload-batch", response_model=dict)
+async def upload_documents_batch(
+    documents: List[DocumentUpload],
+    rag_service: Any = Depends(get_rag_service)
+):
+    """Upload and process several documents with batched embedding and storage"""
+    try:
+        document_ids = await rag_service.batch_process_documents([
+            {
+                "content": document.content,
+                "filename": document.filename,
+                "metadata": document.metadata
+            }
+            for document in documents
+        ])
+        
+        return {
+            "document_ids": document_ids,
+            "status": "processed",
+            "message": f"{len(document_ids)} documents uploaded and processed successfully"
+        }
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/generate-report", response_model=ReportResponse)
-async def generate_report(request: ReportRequest):
+async def generate_report(
+    request: ReportRequest,
+    report_generator: Any = Depends(get_report_generator)
+):
     """Generate comprehensive analysis report"""
     try:
         report = await report_generator.generate_report(
@@ -201,58 +379,48 @@ async def generate_report(request: ReportRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/agents")
-async def list_agents():
+async def list_agents(request: Request):
     """List available agents and their capabilities"""
-    return {
-        "agents": {
-            "discipline_head": {
-                "name": "Discipline Head",
-                "description": "Overall project coordination and decision making",
-                "capabilities": ["project_oversight", "decision_making", "coordination"]
-            },
-            "methods_specialist": {
-                "name": "Methods Specialist", 
-                "description": "Specialized in engineering methods and procedures",
-                "capabilities": ["method_analysis", "procedure_optimization", "best_practices"]
-            },
-            "corrosion_engineer": {
-                "name": "Corrosion Engineer",
-                "description": "Expert in corrosion analysis and prevention",
-                "capabilities": ["corrosion_analysis", "material_selection", "prevention_strategies"]
-            },
-            "subsea_engineer": {
-                "name": "Subsea Engineer",
-                "description": "Specialized in subsea systems and operations",
-                "capabilities": ["subsea_systems", "underwater_operations", "marine_engineering"]
-            }
-        }
-    }
+    return _cacheable_json(request, AGENTS_INFO_JSON, AGENTS_INFO_ETAG, AGENTS_CACHE_MAX_AGE)
 
 @app.post("/chat")
-async def chat_with_agent(request: dict):
+async def chat_with_agent(
+    request: dict,
+    http_request: Request,
+    agents: Dict[str, Any] = Depends(get_agents),
+    rag_service: Any = Depends(get_rag_service)
+):
     """Chat with a specific agent"""
     try:
         agent_type = request.get("agent_type", "methods_specialist")
         message = request.get("message", "")
+        # Cached replies are only reused within one session or user
+        cache_scope = request.get("session_id") or request.get("user_email")
+        response_cache = rag_service if rag_service and cache_scope else None
         
         if agent_type not in agents:
             raise HTTPException(status_code=400, detail=f"Unknown agent type: {agent_type}")
         
-        if not agents[agent_type]:
-            raise HTTPException(status_code=503, detail=f"Agent {agent_type} is not available")
-        
         agent = agents[agent_type]
+        if not agent:
+            raise HTTPException(status_code=503, detail=f"Agent {agent_type} is not available")
         
         # Use the agent's chat method if available, otherwise use analyze
         if hasattr(agent, 'chat'):
-            response = await agent.chat(message)
+            response = response_cache.get_cached_response(agent_type, cache_scope, message) if response_cache else None
+            if response is None:
+                async with _agent_slot(http_request, agent_type):
+                    response = await agent.chat(message)
+                if response_cache and response.get("status") == "success":
+                    response_cache.cache_response(agent_type, cache_scope, message, response)
         else:
             # Fallback to analyze method
-            response = await agent.analyze(
-                document_id="chat",
-                analysis_type="conversation",
-                parameters={"message": message}
-            )
+            async with _agent_slot(http_request, agent_type):
+                response = await agent.analyze(
+                    document_id="chat",
+                    analysis_type="conversation",
+                    parameters={"message": message}
+                )
         
         return {
             "agent_type": agent_type,
@@ -260,14 +428,96 @@ async def chat_with_agent(request: dict):
             "status": "success"
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"Chat error: {e}")
+        logger.error("Chat error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
+async def _dispatch_subrequest(sub: BatchSubRequest) -> Dict[str, Any]:
+    """Run one batched request through the app in-process and capture its response"""
+    path, _, query = sub.url.partition("?")
+    body = b"" if sub.body is None else orjson.dumps(sub.body)
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": sub.method.upper(),
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode())
+        ],
+        "client": None,
+        "server": None
+    }
+    
+    response_done = asyncio.Event()
+    body_sent = False
+    status = 500
+    chunks = []
+    
+    async def receive():
+        nonlocal body_sent
+        if not body_sent:
+            body_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        # Only report a disconnect once the response is complete
+        await response_done.wait()
+        return {"type": "http.disconnect"}
+    
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                response_done.set()
+    
+    try:
+        await app(scope, receive, send)
+    except Exception as e:
+        # ServerErrorMiddleware re-raises after responding; keep the failure local to this sub-request
+        logger.error("❌ Batched request %s %s failed: %s", sub.method.upper(), sub.url, e)
+        return {"id": sub.id, "status": 500, "body": {"detail": "Internal Server Error"}}
+    finally:
+        response_done.set()
+    
+    raw = b"".join(chunks)
+    try:
+        response_body = orjson.loads(raw) if raw else None
+    except ValueError:
+        response_body = raw.decode("utf-8", errors="replace")
+    
+    return {"id": sub.id, "status": status, "body": response_body}
+
+@app.post("/batch")
+async def batch_requests(request: BatchRequest):
+    """Execute several API requests concurrently in one HTTP round-trip"""
+    if len(request.requests) > MAX_BATCH_REQUESTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {MAX_BATCH_REQUESTS} requests are allowed per batch"
+        )
+    if any(sub.url.partition("?")[0] == "/batch" for sub in request.requests):
+        raise HTTPException(status_code=400, detail="Nested batch requests are not allowed")
+    
+    responses = await asyncio.gather(*(_dispatch_subrequest(sub) for sub in request.requests))
+    return {"responses": responses}
+
 if __name__ == "__main__":
     uvicorn.run(
         "app.main:app",
         host="0.0.0.0",
         port=8000,
-        reload=True
+        loop="uvloop",
+        http="httptools",
+        # uvicorn ignores workers when reloading, so DEBUG runs a single process
+        workers=1 if settings.DEBUG else (settings.WORKERS or os.cpu_count()),
+        reload=settings.DEBUG
     )
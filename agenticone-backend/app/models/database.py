@@ -1,17 +1,30 @@
 """
 Firestore database models and operations
 """
-import uuid
-from datetime import datetime
+import logging
+from datetime import datetime, timezone
 from typing import Dict, List, Optional, Any
+from ulid import ULID
 from google.cloud import firestore
 from google.cloud.firestore_v1.base_query import FieldFilter
 
-from app.config import settings
+from app.config import get_settings
 from app.models.schemas import AnalysisRecord, DocumentRecord, ReportRecord
 
+logger = logging.getLogger(__name__)
+
+# Firestore rejects write batches larger than this
+FIRESTORE_BATCH_LIMIT = 500
+
+# Projection for document queries: only the fields DocumentRecord needs
+DOCUMENT_FIELDS = list(DocumentRecord.model_fields)
+
 class FirestoreClient:
-    """Firestore database client"""
+    """Firestore database client (async, so RPCs never block the event loop)
+
+    Records read back from Firestore were validated when written, so reads
+    build them with ``model_construct`` rather than re-running validation.
+    """
     
     def __init__(self):
         self.db = None
@@ -22,7 +35,8 @@ class FirestoreClient:
         """Initialize the Firestore client if not already done"""
         if not self._initialized:
             try:
-                self.db = firestore.Client(
+                settings = get_settings()
+                self.db = firestore.AsyncClient(
                     project=settings.FIRESTORE_PROJECT_ID,
                     database=settings.FIRESTORE_DATABASE_ID
                 )
@@ -34,7 +48,7 @@ class FirestoreClient:
                 }
                 self._initialized = True
             except Exception as e:
-                print(f"Warning: Could not initialize Firestore client: {e}")
+                logger.warning("Could not initialize Firestore client: %s", e)
                 # Create mock collections for development
                 self.collections = {
                     "documents": None,
@@ -44,38 +58,65 @@ class FirestoreClient:
                 }
                 self._initialized = True
     
-    async def create_document(self, document_data: Dict[str, Any]) -> str:
-        """Create a new document record"""
+    async def warm_up(self):
+        """Create the client and make one round trip so startup surfaces connection errors"""
         self._ensure_initialized()
-        document_id = str(uuid.uuid4())
-        document_record = DocumentRecord(
-            document_id=document_id,
+        if self.db is not None:
+            async for _ in self.db.collections():
+                break
+    
+    def _build_document_record(self, document_data: Dict[str, Any]) -> DocumentRecord:
+        """Build a document record, keeping a caller-supplied ID or generating one"""
+        now = datetime.now(timezone.utc)
+        return DocumentRecord(
+            document_id=document_data.get("document_id") or str(ULID()),
             filename=document_data["filename"],
             document_type=document_data["document_type"],
             size=document_data["size"],
             storage_path=document_data["storage_path"],
             metadata=document_data.get("metadata", {}),
-            created_at=datetime.utcnow(),
-            updated_at=datetime.utcnow()
+            created_at=now,
+            updated_at=now
         )
+    
+    async def create_document(self, document_data: Dict[str, Any]) -> str:
+        """Create a new document record"""
+        self._ensure_initialized()
+        document_record = self._build_document_record(document_data)
+        document_id = document_record.document_id
         
         if self.collections["documents"]:
-            self.collections["documents"].document(document_id).set(document_record.dict())
+            await self.collections["documents"].document(document_id).set(document_record.model_dump())
         return document_id
     
+    async def create_documents_bulk(self, documents_data: List[Dict[str, Any]]) -> List[str]:
+        """Create many document records, committing up to 500 writes per RPC"""
+        self._ensure_initialized()
+        records = [self._build_document_record(data) for data in documents_data]
+        
+        if self.collections["documents"]:
+            for start in range(0, len(records), FIRESTORE_BATCH_LIMIT):
+                batch = self.db.batch()
+                for record in records[start:start + FIRESTORE_BATCH_LIMIT]:
+                    batch.set(self.collections["documents"].document(record.document_id), record.model_dump())
+                await batch.commit()
+        
+        return [record.document_id for record in records]
+    
     async def get_document(self, document_id: str) -> Optional[DocumentRecord]:
         """Get document by ID"""
         self._ensure_initialized()
         if not self.collections["documents"]:
             return None
-        doc = self.collections["documents"].document(document_id).get()
+        doc = await self.collections["documents"].document(document_id).get()
         if doc.exists:
-            return DocumentRecord(**doc.to_dict())
+            return DocumentRecord.model_construct(**doc.to_dict())
         return None
     
     async def create_analysis(self, analysis_data: Dict[str, Any]) -> str:
         """Create a new analysis record"""
-        analysis_id = str(uuid.uuid4())
+        analysis_id = str(ULID())
+        now = datetime.now(timezone.utc)
         analysis_record = AnalysisRecord(
             analysis_id=analysis_id,
             document_id=analysis_data["document_id"],
@@ -84,18 +125,18 @@ class FirestoreClient:
             results=analysis_data["results"],
             confidence=analysis_data["confidence"],
             recommendations=analysis_data["recommendations"],
-            created_at=datetime.utcnow(),
-            updated_at=datetime.utcnow()
+            created_at=now,
+            updated_at=now
         )
         
-        self.collections["analyses"].document(analysis_id).set(analysis_record.dict())
+        await self.collections["analyses"].document(analysis_id).set(analysis_record.model_dump())
         return analysis_id
     
     async def get_analysis(self, analysis_id: str) -> Optional[AnalysisRecord]:
         """Get analysis by ID"""
-        doc = self.collections["analyses"].document(analysis_id).get()
+        doc = await self.collections["analyses"].document(analysis_id).get()
         if doc.exists:
-            return AnalysisRecord(**doc.to_dict())
+            return AnalysisRecord.model_construct(**doc.to_dict())
         return None
     
     async def get_analyses_by_document(self, document_id: str) -> List[AnalysisRecord]:
@@ -103,16 +144,12 @@ class FirestoreClient:
         query = self.collections["analyses"].where(
             filter=FieldFilter("document_id", "==", document_id)
         )
-        docs = query.stream()
-        
-        analyses = []
-        for doc in docs:
-            analyses.append(AnalysisRecord(**doc.to_dict()))
-        return analyses
+        return [AnalysisRecord.model_construct(**doc.to_dict()) async for doc in query.stream()]
     
     async def create_report(self, report_data: Dict[str, Any]) -> str:
         """Create a new report record"""
-        report_id = str(uuid.uuid4())
+        report_id = str(ULID())
+        now = datetime.now(timezone.utc)
         report_record = ReportRecord(
             report_id=report_id,
             analysis_ids=report_data["analysis_ids"],
@@ -120,25 +157,25 @@ class FirestoreClient:
             template=report_data.get("template"),
             report_url=report_data["report_url"],
             status=report_data["status"],
-            created_at=datetime.utcnow(),
-            updated_at=datetime.utcnow()
+            created_at=now,
+            updated_at=now
         )
         
-        self.collections["reports"].document(report_id).set(report_record.dict())
+        await self.collections["reports"].document(report_id).set(report_record.model_dump())
         return report_id
     
     async def get_report(self, report_id: str) -> Optional[ReportRecord]:
         """Get report by ID"""
-        doc = self.collections["reports"].document(report_id).get()
+        doc = await self.collections["reports"].document(report_id).get()
         if doc.exists:
-            return ReportRecord(**doc.to_dict())
+            return ReportRecord.model_construct(**doc.to_dict())
         return None
     
     async def update_analysis(self, analysis_id: str, updates: Dict[str, Any]) -> bool:
         """Update analysis record"""
         try:
-            updates["updated_at"] = datetime.utcnow()
-            self.collections["analyses"].document(analysis_id).update(updates)
+            updates["updated_at"] = datetime.now(timezone.utc)
+            await self.collections["analyses"].document(analysis_id).update(updates)
             return True
         except Exception:
             return False
@@ -146,28 +183,25 @@ class FirestoreClient:
     async def update_report(self, report_id: str, updates: Dict[str, Any]) -> bool:
         """Update report record"""
         try:
-            updates["updated_at"] = datetime.utcnow()
-            self.collections["reports"].document(report_id).update(updates)
+            updates["updated_at"] = datetime.now(timezone.utc)
+            await self.collections["reports"].document(report_id).update(updates)
             return True
         except Exception:
             return False
     
-    async def search_documents(self, filters: Dict[str, Any]) -> List[DocumentRecord]:
-        """Search documents with filters"""
+    async def search_documents(self, filters: Dict[str, Any], limit: int = 100) -> List[DocumentRecord]:
+        """Search documents with filters, returning at most ``limit`` records"""
         query = self.collections["documents"]
         
         for field, value in filters.items():
             query = query.where(filter=FieldFilter(field, "==", value))
+        query = query.limit(limit).select(DOCUMENT_FIELDS)
         
-        docs = query.stream()
-        documents = []
-        for doc in docs:
-            documents.append(DocumentRecord(**doc.to_dict()))
-        return documents
+        return [DocumentRecord.model_construct(**doc.to_dict()) async for doc in query.stream()]
     
     async def get_agent_status(self, agent_id: str) -> Optional[Dict[str, Any]]:
         """Get agent status"""
-        doc = self.collections["agents"].document(agent_id).get()
+        doc = await self.collections["agents"].document(agent_id).get()
         if doc.exists:
             return doc.to_dict()
         return None
@@ -175,8 +209,8 @@ class FirestoreClient:
     async def update_agent_status(self, agent_id: str, status: Dict[str, Any]) -> bool:
         """Update agent status"""
         try:
-            status["updated_at"] = datetime.utcnow()
-            self.collections["agents"].document(agent_id).set(status, merge=True)
+            status["updated_at"] = datetime.now(timezone.utc)
+            await self.collections["agents"].document(agent_id).set(status, merge=True)
             return True
         except Exception:
             return False
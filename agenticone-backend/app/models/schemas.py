@@ -2,7 +2,7 @@
 Pydantic schemas for API requests and responses
 """
 from typing import Dict, List, Optional, Any, Union
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
 from enum import Enum
 
@@ -35,6 +35,7 @@ class AnalysisRequest(BaseModel):
     document_id: str = Field(..., description="ID of the document to analyze")
     analysis_type: AnalysisType = Field(..., description="Type of analysis to perform")
     agent_type: Optional[AgentType] = Field(None, description="Specific agent to use")
+    agent_types: Optional[List[AgentType]] = Field(None, description="Run several agents concurrently; overrides agent_type")
     parameters: Optional[Dict[str, Any]] = Field(default_factory=dict, description="Analysis parameters")
 
 class DocumentUpload(BaseModel):
@@ -51,9 +52,22 @@ class ReportRequest(BaseModel):
     template: Optional[str] = Field(None, description="Custom report template")
     parameters: Optional[Dict[str, Any]] = Field(default_factory=dict, description="Report parameters")
 
+class BatchSubRequest(BaseModel):
+    """Single request inside a batch"""
+    id: str = Field(..., description="Client-chosen identifier echoed in the response")
+    method: str = Field("GET", description="HTTP method")
+    url: str = Field(..., description="Path (and optional query string) within this API")
+    body: Optional[Any] = Field(None, description="JSON request body")
+
+class BatchRequest(BaseModel):
+    """Several API requests sent in one round-trip"""
+    requests: List[BatchSubRequest] = Field(..., description="Requests to execute concurrently")
+
 # Response Models
 class AnalysisResult(BaseModel):
     """Individual analysis result"""
+    model_config = ConfigDict(frozen=True)
+    
     category: str = Field(..., description="Result category")
     findings: List[str] = Field(..., description="Key findings")
     confidence: float = Field(..., ge=0, le=1, description="Confidence score")
@@ -61,6 +75,8 @@ class AnalysisResult(BaseModel):
 
 class AnalysisResponse(BaseModel):
     """Response for analysis request"""
+    model_config = ConfigDict(frozen=True)
+    
     analysis_id: str = Field(..., description="Unique analysis ID")
     agent_type: str = Field(..., description="Agent that performed the analysis")
     results: List[AnalysisResult] = Field(..., description="Analysis results")
@@ -68,12 +84,39 @@ class AnalysisResponse(BaseModel):
     recommendations: List[str] = Field(..., description="Recommendations")
     timestamp: datetime = Field(default_factory=datetime.utcnow, description="Analysis timestamp")
 
+class MultiAgentAnalysisResponse(BaseModel):
+    """Response for an analysis run across several agents"""
+    model_config = ConfigDict(frozen=True)
+    
+    analyses: List[AnalysisResponse] = Field(..., description="Per-agent analysis results")
+    timestamp: datetime = Field(default_factory=datetime.utcnow, description="Analysis timestamp")
+
 class ReportResponse(BaseModel):
     """Response for report generation"""
+    model_config = ConfigDict(frozen=True)
+    
     report_id: str = Field(..., description="Unique report ID")
     report_url: str = Field(..., description="URL to access the report")
     status: str = Field(..., description="Report generation status")
 
+class ReportFileInfo(BaseModel):
+    """Report file stored on disk"""
+    model_config = ConfigDict(frozen=True)
+    
+    filename: str = Field(..., description="Report filename")
+    path: str = Field(..., description="Path to the report file")
+    size: int = Field(..., description="File size in bytes")
+    created: datetime = Field(..., description="File creation timestamp")
+    type: Optional[str] = Field(None, description="Report format")
+
+class ReportListResponse(BaseModel):
+    """Response for report listing"""
+    model_config = ConfigDict(frozen=True)
+    
+    status: str = Field(..., description="Request status")
+    reports: List[ReportFileInfo] = Field(..., description="Available reports")
+    count: int = Field(..., description="Number of reports")
+
 class DocumentMetadata(BaseModel):
     """Document metadata"""
     document_id: str = Field(..., description="Unique document ID")
@@ -100,6 +143,8 @@ class AgentInfo(BaseModel):
 # Database Models
 class AnalysisRecord(BaseModel):
     """Analysis record for database storage"""
+    model_config = ConfigDict(frozen=True)
+    
     analysis_id: str
     document_id: str
     agent_type: str
@@ -112,6 +157,8 @@ class AnalysisRecord(BaseModel):
 
 class DocumentRecord(BaseModel):
     """Document record for database storage"""
+    model_config = ConfigDict(frozen=True)
+    
     document_id: str
     filename: str
     document_type: str
@@ -123,6 +170,8 @@ class DocumentRecord(BaseModel):
 
 class ReportRecord(BaseModel):
     """Report record for database storage"""
+    model_config = ConfigDict(frozen=True)
+    
     report_id: str
     analysis_ids: List[str]
     report_type: str
@@ -3,15 +3,64 @@ Enhanced Agent Evaluation System
 Provides comprehensive evaluation metrics and feedback for AI agents
 """
 
-import json
 import asyncio
+import logging
 import re
+import hashlib
+import heapq
+import sqlite3
+import threading
+from collections import Counter, OrderedDict
+from contextlib import closing
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Callable, Dict, FrozenSet, List, Any, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
+from functools import lru_cache
 from pathlib import Path
 
+import numpy as np
+import orjson
+
+from app.utils.batching import AsyncBatcher
+
+logger = logging.getLogger(__name__)
+
+# SQLite index of saved evaluations, kept next to the JSON files
+EVALUATION_INDEX_FILE = "index.db"
+
+_INDEX_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS evals (
+        path TEXT PRIMARY KEY,
+        agent_role TEXT NOT NULL,
+        user_email TEXT,
+        evaluation_date TEXT NOT NULL,
+        evaluation_epoch REAL NOT NULL,
+        overall_score REAL NOT NULL,
+        strengths_json TEXT NOT NULL,
+        improvements_json TEXT NOT NULL,
+        recommendations_json TEXT NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS evals_role_user_epoch ON evals (agent_role, user_email, evaluation_epoch)"
+)
+
+# Index databases already created or migrated in this process; set up off the event loop on first use
+_initialized_indexes: set = set()
+_index_init_lock = threading.Lock()
+
+_INDEX_UPSERT = """INSERT OR REPLACE INTO evals (
+    path, agent_role, user_email, evaluation_date, evaluation_epoch, overall_score,
+    strengths_json, improvements_json, recommendations_json
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"""
+
+# Saves arriving within this window are written together, up to the batch size
+EVALUATION_WRITE_BATCH_SIZE = 64
+EVALUATION_WRITE_WAIT_S = 0.01
+
+# Keyword metric results remembered across service instances, keyed by conversation content
+METRIC_CACHE_SIZE = 1_000
+_metric_cache: "OrderedDict[str, Dict[str, float]]" = OrderedDict()
+
 class EvaluationMetric(Enum):
     """Types of evaluation metrics"""
     RESPONSE_QUALITY = "response_quality"
@@ -22,7 +71,10 @@ class EvaluationMetric(Enum):
     RESPONSE_TIME = "response_time"
     CONTEXT_UNDERSTANDING = "context_understanding"
 
-@dataclass
+# Human-readable metric names used in strengths/improvements text
+_METRIC_LABELS = {metric: metric.value.replace("_", " ") for metric in EvaluationMetric}
+
+@dataclass(slots=True, frozen=True)
 class EvaluationScore:
     """Individual evaluation score"""
     metric: EvaluationMetric
@@ -31,7 +83,7 @@ class EvaluationScore:
     feedback: str
     timestamp: datetime
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class AgentEvaluation:
     """Complete agent evaluation"""
     agent_role: str
@@ -48,9 +100,82 @@ class AgentEvaluation:
 class AgentEvaluationService:
     """Service for evaluating agent performance"""
     
+    # Keyword buckets for the heuristic metrics (matched against lowercased content)
+    _QUALITY_WORDS = frozenset({"analysis", "recommendation", "suggestion", "consider"})
+    _EVIDENCE_WORDS = frozenset({"based on", "according to", "in my experience"})
+    _CLARITY_WORDS = frozenset({"clearly", "specifically", "in summary", "to clarify"})
+    _SOLUTION_WORDS = frozenset({"solution", "approach", "strategy", "method"})
+    _STEP_WORDS = frozenset({"step", "process", "procedure", "workflow"})
+    _RECOMMEND_WORDS = frozenset({"recommend", "suggest", "propose", "advise"})
+    _CONTEXT_REF_WORDS = frozenset({"as mentioned", "previously", "earlier", "before"})
+    _CONTEXT_YOUR_WORDS = frozenset({"based on your", "considering your", "given your"})
+    
+    # Role-specific technical keywords
+    _ROLE_KEYWORDS = {
+        "corrosion_engineer": frozenset({"corrosion", "material", "degradation", "prevention", "inspection", "coating"}),
+        # "ROV" is never found in lowercased content but still counts towards the role's keyword total
+        "subsea_engineer": frozenset({"subsea", "underwater", "ROV", "pipeline", "structure", "marine"}),
+        "methods_specialist": frozenset({"methodology", "procedure", "process", "optimization", "efficiency", "standard"}),
+        "discipline_head": frozenset({"strategy", "management", "coordination", "oversight", "planning", "leadership"})
+    }
+    
+    # Feedback per metric as (minimum score, message), best first; the last entry is the fallback
+    _FEEDBACK = {
+        EvaluationMetric.RESPONSE_QUALITY: (
+            (0.8, "Excellent response quality with comprehensive and detailed answers."),
+            (0.6, "Good response quality with adequate detail and structure."),
+            (0.4, "Fair response quality, could benefit from more detailed explanations."),
+            (0.0, "Response quality needs improvement. Consider providing more comprehensive answers.")
+        ),
+        EvaluationMetric.TECHNICAL_ACCURACY: (
+            (0.8, "Excellent technical accuracy for {role_name} with strong domain knowledge."),
+            (0.6, "Good technical accuracy for {role_name} with solid domain understanding."),
+            (0.4, "Fair technical accuracy for {role_name}, consider strengthening domain expertise."),
+            (0.0, "Technical accuracy needs improvement for {role_name}. Focus on domain-specific knowledge.")
+        ),
+        EvaluationMetric.COMMUNICATION_CLARITY: (
+            (0.8, "Excellent communication clarity with well-structured and understandable responses."),
+            (0.6, "Good communication clarity with clear and coherent explanations."),
+            (0.4, "Fair communication clarity, consider improving sentence structure and explanations."),
+            (0.0, "Communication clarity needs improvement. Focus on clearer explanations and structure.")
+        ),
+        EvaluationMetric.PROBLEM_SOLVING: (
+            (0.8, "Excellent problem-solving approach with systematic and strategic thinking."),
+            (0.6, "Good problem-solving approach with logical reasoning and suggestions."),
+            (0.4, "Fair problem-solving approach, consider providing more structured solutions."),
+            (0.0, "Problem-solving approach needs improvement. Focus on systematic solution development.")
+        ),
+        EvaluationMetric.USER_SATISFACTION: (
+            (0.8, "High user satisfaction with positive feedback and engagement."),
+            (0.6, "Good user satisfaction with generally positive interactions."),
+            (0.4, "Fair user satisfaction, consider improving user experience and engagement."),
+            (0.0, "User satisfaction needs improvement. Focus on better user experience and interaction.")
+        ),
+        EvaluationMetric.CONTEXT_UNDERSTANDING: (
+            (0.8, "Excellent context understanding with strong conversation memory and continuity."),
+            (0.6, "Good context understanding with adequate conversation awareness."),
+            (0.4, "Fair context understanding, consider improving conversation continuity."),
+            (0.0, "Context understanding needs improvement. Focus on better conversation memory.")
+        )
+    }
+    
+    # Response time feedback as (maximum seconds, message), fastest first
+    _RESPONSE_TIME_FEEDBACK = (
+        (2.0, "Excellent response time ({avg_time:.1f}s) with quick and efficient responses."),
+        (5.0, "Good response time ({avg_time:.1f}s) with reasonable response speed."),
+        (10.0, "Fair response time ({avg_time:.1f}s), consider optimizing for faster responses."),
+        (float("inf"), "Response time needs improvement ({avg_time:.1f}s). Focus on faster response generation.")
+    )
+    
+    _COMMON_KEYWORDS = frozenset().union(
+        _QUALITY_WORDS, _EVIDENCE_WORDS, _CLARITY_WORDS, _SOLUTION_WORDS, _STEP_WORDS,
+        _RECOMMEND_WORDS, _CONTEXT_REF_WORDS, _CONTEXT_YOUR_WORDS
+    )
+    
     def __init__(self):
         self.evaluations_dir = Path("evaluations")
         self.evaluations_dir.mkdir(exist_ok=True)
+        self.index_path = self.evaluations_dir / EVALUATION_INDEX_FILE
         
         # Evaluation criteria weights
         self.metric_weights = {
@@ -73,87 +198,86 @@ class AgentEvaluationService:
     ) -> AgentEvaluation:
         """Evaluate a complete conversation"""
         
+        # One timestamp shared by every score and the evaluation itself
+        now = datetime.now()
+        
         # Extract conversation metrics
         messages = conversation_data.get("messages", [])
         response_times = self._calculate_response_times(messages)
         
-        # Generate individual scores
-        individual_scores = []
-        
-        # Response Quality
-        response_quality_score = await self._evaluate_response_quality(messages)
-        individual_scores.append(EvaluationScore(
-            metric=EvaluationMetric.RESPONSE_QUALITY,
-            score=response_quality_score,
-            weight=self.metric_weights[EvaluationMetric.RESPONSE_QUALITY],
-            feedback=self._generate_response_quality_feedback(response_quality_score),
-            timestamp=datetime.now()
-        ))
-        
-        # Technical Accuracy
-        technical_score = await self._evaluate_technical_accuracy(messages, agent_role)
-        individual_scores.append(EvaluationScore(
-            metric=EvaluationMetric.TECHNICAL_ACCURACY,
-            score=technical_score,
-            weight=self.metric_weights[EvaluationMetric.TECHNICAL_ACCURACY],
-            feedback=self._generate_technical_feedback(technical_score, agent_role),
-            timestamp=datetime.now()
-        ))
-        
-        # Communication Clarity
-        clarity_score = await self._evaluate_communication_clarity(messages)
-        individual_scores.append(EvaluationScore(
-            metric=EvaluationMetric.COMMUNICATION_CLARITY,
-            score=clarity_score,
-            weight=self.metric_weights[EvaluationMetric.COMMUNICATION_CLARITY],
-            feedback=self._generate_clarity_feedback(clarity_score),
-            timestamp=datetime.now()
-        ))
-        
-        # Problem Solving
-        problem_solving_score = await self._evaluate_problem_solving(messages)
-        individual_scores.append(EvaluationScore(
-            metric=EvaluationMetric.PROBLEM_SOLVING,
-            score=problem_solving_score,
-            weight=self.metric_weights[EvaluationMetric.PROBLEM_SOLVING],
-            feedback=self._generate_problem_solving_feedback(problem_solving_score),
-            timestamp=datetime.now()
-        ))
+        # Keyword metrics (technical accuracy scored for this agent role) come from one scan
+        metric_scores = self._score_all_metrics(messages, agent_role)
+        response_quality_score = metric_scores["response_quality"]
+        technical_score = metric_scores["technical_accuracy"]
+        clarity_score = metric_scores["communication_clarity"]
+        problem_solving_score = metric_scores["problem_solving"]
+        context_score = metric_scores["context_understanding"]
         
         # User Satisfaction (from user feedback if available)
         user_satisfaction_score = 0.5  # Default neutral score
         if user_feedback:
             user_satisfaction_score = user_feedback.get("satisfaction_score", 0.5)
         
-        individual_scores.append(EvaluationScore(
-            metric=EvaluationMetric.USER_SATISFACTION,
-            score=user_satisfaction_score,
-            weight=self.metric_weights[EvaluationMetric.USER_SATISFACTION],
-            feedback=self._generate_user_satisfaction_feedback(user_satisfaction_score),
-            timestamp=datetime.now()
-        ))
-        
         # Response Time
         avg_response_time = sum(response_times) / len(response_times) if response_times else 5.0
         response_time_score = max(0.0, min(1.0, 1.0 - (avg_response_time / 10.0)))  # Normalize to 0-1
         
-        individual_scores.append(EvaluationScore(
-            metric=EvaluationMetric.RESPONSE_TIME,
-            score=response_time_score,
-            weight=self.metric_weights[EvaluationMetric.RESPONSE_TIME],
-            feedback=self._generate_response_time_feedback(avg_response_time),
-            timestamp=datetime.now()
-        ))
-        
-        # Context Understanding
-        context_score = await self._evaluate_context_understanding(messages)
-        individual_scores.append(EvaluationScore(
-            metric=EvaluationMetric.CONTEXT_UNDERSTANDING,
-            score=context_score,
-            weight=self.metric_weights[EvaluationMetric.CONTEXT_UNDERSTANDING],
-            feedback=self._generate_context_feedback(context_score),
-            timestamp=datetime.now()
-        ))
+        # Generate individual scores
+        individual_scores = [
+            EvaluationScore(
+                metric=EvaluationMetric.RESPONSE_QUALITY,
+                score=response_quality_score,
+                weight=self.metric_weights[EvaluationMetric.RESPONSE_QUALITY],
+                feedback=self._generate_feedback(EvaluationMetric.RESPONSE_QUALITY, response_quality_score),
+                timestamp=now
+            ),
+            EvaluationScore(
+                metric=EvaluationMetric.TECHNICAL_ACCURACY,
+                score=technical_score,
+                weight=self.metric_weights[EvaluationMetric.TECHNICAL_ACCURACY],
+                feedback=self._generate_feedback(
+                    EvaluationMetric.TECHNICAL_ACCURACY,
+                    technical_score,
+                    role_name=agent_role.replace("_", " ").title()
+                ),
+                timestamp=now
+            ),
+            EvaluationScore(
+                metric=EvaluationMetric.COMMUNICATION_CLARITY,
+                score=clarity_score,
+                weight=self.metric_weights[EvaluationMetric.COMMUNICATION_CLARITY],
+                feedback=self._generate_feedback(EvaluationMetric.COMMUNICATION_CLARITY, clarity_score),
+                timestamp=now
+            ),
+            EvaluationScore(
+                metric=EvaluationMetric.PROBLEM_SOLVING,
+                score=problem_solving_score,
+                weight=self.metric_weights[EvaluationMetric.PROBLEM_SOLVING],
+                feedback=self._generate_feedback(EvaluationMetric.PROBLEM_SOLVING, problem_solving_score),
+                timestamp=now
+            ),
+            EvaluationScore(
+                metric=EvaluationMetric.USER_SATISFACTION,
+                score=user_satisfaction_score,
+                weight=self.metric_weights[EvaluationMetric.USER_SATISFACTION],
+                feedback=self._generate_feedback(EvaluationMetric.USER_SATISFACTION, user_satisfaction_score),
+                timestamp=now
+            ),
+            EvaluationScore(
+                metric=EvaluationMetric.RESPONSE_TIME,
+                score=response_time_score,
+                weight=self.metric_weights[EvaluationMetric.RESPONSE_TIME],
+                feedback=self._generate_response_time_feedback(avg_response_time),
+                timestamp=now
+            ),
+            EvaluationScore(
+                metric=EvaluationMetric.CONTEXT_UNDERSTANDING,
+                score=context_score,
+                weight=self.metric_weights[EvaluationMetric.CONTEXT_UNDERSTANDING],
+                feedback=self._generate_feedback(EvaluationMetric.CONTEXT_UNDERSTANDING, context_score),
+                timestamp=now
+            )
+        ]
         
         # Calculate overall score
         overall_score = sum(score.score * score.weight for score in individual_scores)
@@ -173,7 +297,7 @@ class AgentEvaluationService:
             strengths=strengths,
             improvements=improvements,
             recommendations=recommendations,
-            evaluation_date=datetime.now(),
+            evaluation_date=now,
             evaluator_type="system"
         )
         
@@ -186,247 +310,165 @@ class AgentEvaluationService:
         """Calculate response times between messages"""
         response_times = []
         
-        for i in range(1, len(messages), 2):  # Every other message (assistant responses)
-            if i < len(messages):
-                try:
-                    user_time = datetime.fromisoformat(messages[i-1]["timestamp"])
-                    assistant_time = datetime.fromisoformat(messages[i]["timestamp"])
-                    response_time = (assistant_time - user_time).total_seconds()
-                    response_times.append(response_time)
-                except (KeyError, ValueError):
-                    continue
+        # Pair each user message with the assistant response that follows it
+        for user_message, assistant_message in zip(messages[0::2], messages[1::2]):
+            try:
+                user_time = datetime.fromisoformat(user_message["timestamp"])
+                assistant_time = datetime.fromisoformat(assistant_message["timestamp"])
+                response_times.append((assistant_time - user_time).total_seconds())
+            except (KeyError, ValueError):
+                continue
         
         return response_times
     
-    async def _evaluate_response_quality(self, messages: List[Dict[str, Any]]) -> float:
-        """Evaluate the quality of responses"""
-        assistant_messages = [msg for msg in messages if msg.get("role") == "assistant"]
-        
-        if not assistant_messages:
-            return 0.0
+    def _score_all_metrics(self, messages: List[Dict[str, Any]], agent_role: str) -> Dict[str, float]:
+        """Score every keyword-based metric, reusing the result for a replayed conversation"""
+        cache_key = self._metric_cache_key(messages, agent_role)
+        cached = _metric_cache.get(cache_key)
+        if cached is not None:
+            _metric_cache.move_to_end(cache_key)
+            return cached
+        
+        metric_scores = self._scan_messages(messages, agent_role)
+        _metric_cache[cache_key] = metric_scores
+        if len(_metric_cache) > METRIC_CACHE_SIZE:
+            _metric_cache.popitem(last=False)
+        return metric_scores
+    
+    @staticmethod
+    def _metric_cache_key(messages: List[Dict[str, Any]], agent_role: str) -> str:
+        """Digest of everything the keyword metrics depend on: role, message roles and contents"""
+        digest = hashlib.blake2b(agent_role.encode(), digest_size=16)
+        for message in messages:
+            digest.update(b"\x00" + str(message.get("role")).encode())
+            digest.update(b"\x01" + message.get("content", "").encode())
+        return digest.hexdigest()
+    
+    def _scan_messages(self, messages: List[Dict[str, Any]], agent_role: str) -> Dict[str, float]:
+        """Score every keyword-based metric in a single pass over the messages"""
+        scan_keywords, technical_scorer = self._role_scorer(agent_role)
         
+        assistant_count = 0
         quality_indicators = 0
-        total_indicators = 0
+        technical_score = 0.0
+        clarity_score = 0.0
+        problem_solving_score = 0.0
+        context_score = 0.0
         
-        for message in assistant_messages:
-            content = message.get("content", "").lower()
+        for i, message in enumerate(messages):
+            if message.get("role") != "assistant":
+                continue
             
-            # Check for quality indicators
-            if len(content) > 50:  # Substantial response
-                quality_indicators += 1
-            total_indicators += 1
+            content = message.get("content", "")
+            matched = self._match_keywords(content.lower(), scan_keywords)
+            assistant_count += 1
             
-            if any(word in content for word in ["analysis", "recommendation", "suggestion", "consider"]):
+            # Response quality: substantial, analytical and evidence-backed answers
+            if len(content) > 50:
                 quality_indicators += 1
-            total_indicators += 1
-            
-            if any(word in content for word in ["based on", "according to", "in my experience"]):
+            if matched & self._QUALITY_WORDS:
+                quality_indicators += 1
+            if matched & self._EVIDENCE_WORDS:
                 quality_indicators += 1
-            total_indicators += 1
-        
-        return quality_indicators / total_indicators if total_indicators > 0 else 0.0
-    
-    async def _evaluate_technical_accuracy(self, messages: List[Dict[str, Any]], agent_role: str) -> float:
-        """Evaluate technical accuracy based on agent role"""
-        assistant_messages = [msg for msg in messages if msg.get("role") == "assistant"]
-        
-        if not assistant_messages:
-            return 0.0
-        
-        # Role-specific technical keywords
-        technical_keywords = {
-            "corrosion_engineer": ["corrosion", "material", "degradation", "prevention", "inspection", "coating"],
-            "subsea_engineer": ["subsea", "underwater", "ROV", "pipeline", "structure", "marine"],
-            "methods_specialist": ["methodology", "procedure", "process", "optimization", "efficiency", "standard"],
-            "discipline_head": ["strategy", "management", "coordination", "oversight", "planning", "leadership"]
-        }
-        
-        keywords = technical_keywords.get(agent_role, [])
-        technical_score = 0.0
-        
-        for message in assistant_messages:
-            content = message.get("content", "").lower()
-            keyword_count = sum(1 for keyword in keywords if keyword in content)
-            technical_score += min(1.0, keyword_count / len(keywords)) if keywords else 0.5
-        
-        return technical_score / len(assistant_messages) if assistant_messages else 0.0
-    
-    async def _evaluate_communication_clarity(self, messages: List[Dict[str, Any]]) -> float:
-        """Evaluate communication clarity"""
-        assistant_messages = [msg for msg in messages if msg.get("role") == "assistant"]
-        
-        if not assistant_messages:
-            return 0.0
-        
-        clarity_score = 0.0
-        
-        for message in assistant_messages:
-            content = message.get("content", "")
             
-            # Check for clarity indicators
-            if len(content.split()) > 10:  # Substantial content
-                clarity_score += 0.3
+            # Technical accuracy: share of the role's domain keywords used
+            technical_score += technical_scorer(matched)
             
-            if any(word in content.lower() for word in ["clearly", "specifically", "in summary", "to clarify"]):
+            # Communication clarity
+            if len(content.split(maxsplit=10)) > 10:  # Substantial content (stops splitting at 11 words)
+                clarity_score += 0.3
+            if matched & self._CLARITY_WORDS:
                 clarity_score += 0.2
-            
-            if content.count(".") > 0:  # Proper sentence structure
+            if "." in content:  # Proper sentence structure
                 clarity_score += 0.2
-            
             if len(content) > 100:  # Detailed response
                 clarity_score += 0.3
-        
-        return min(1.0, clarity_score / len(assistant_messages)) if assistant_messages else 0.0
-    
-    async def _evaluate_problem_solving(self, messages: List[Dict[str, Any]]) -> float:
-        """Evaluate problem-solving approach"""
-        assistant_messages = [msg for msg in messages if msg.get("role") == "assistant"]
-        
-        if not assistant_messages:
-            return 0.0
-        
-        problem_solving_score = 0.0
-        
-        for message in assistant_messages:
-            content = message.get("content", "").lower()
             
-            # Check for problem-solving indicators
-            if any(word in content for word in ["solution", "approach", "strategy", "method"]):
+            # Problem solving
+            if matched & self._SOLUTION_WORDS:
                 problem_solving_score += 0.4
-            
-            if any(word in content for word in ["step", "process", "procedure", "workflow"]):
+            if matched & self._STEP_WORDS:
                 problem_solving_score += 0.3
-            
-            if any(word in content for word in ["recommend", "suggest", "propose", "advise"]):
+            if matched & self._RECOMMEND_WORDS:
                 problem_solving_score += 0.3
-        
-        return min(1.0, problem_solving_score / len(assistant_messages)) if assistant_messages else 0.0
-    
-    async def _evaluate_context_understanding(self, messages: List[Dict[str, Any]]) -> float:
-        """Evaluate context understanding"""
-        if len(messages) < 2:
-            return 0.0
-        
-        context_score = 0.0
-        
-        # Check if assistant references previous conversation
-        for i, message in enumerate(messages):
-            if message.get("role") == "assistant" and i > 0:
-                content = message.get("content", "").lower()
-                
-                if any(word in content for word in ["as mentioned", "previously", "earlier", "before"]):
+            
+            # Context understanding: references to earlier turns
+            if i > 0:
+                if matched & self._CONTEXT_REF_WORDS:
                     context_score += 0.5
-                
-                if any(word in content for word in ["based on your", "considering your", "given your"]):
+                if matched & self._CONTEXT_YOUR_WORDS:
                     context_score += 0.5
         
-        return min(1.0, context_score)
-    
-    def _generate_response_quality_feedback(self, score: float) -> str:
-        """Generate feedback for response quality"""
-        if score >= 0.8:
-            return "Excellent response quality with comprehensive and detailed answers."
-        elif score >= 0.6:
-            return "Good response quality with adequate detail and structure."
-        elif score >= 0.4:
-            return "Fair response quality, could benefit from more detailed explanations."
-        else:
-            return "Response quality needs improvement. Consider providing more comprehensive answers."
-    
-    def _generate_technical_feedback(self, score: float, agent_role: str) -> str:
-        """Generate technical accuracy feedback"""
-        role_name = agent_role.replace("_", " ").title()
-        
-        if score >= 0.8:
-            return f"Excellent technical accuracy for {role_name} with strong domain knowledge."
-        elif score >= 0.6:
-            return f"Good technical accuracy for {role_name} with solid domain understanding."
-        elif score >= 0.4:
-            return f"Fair technical accuracy for {role_name}, consider strengthening domain expertise."
-        else:
-            return f"Technical accuracy needs improvement for {role_name}. Focus on domain-specific knowledge."
+        if not assistant_count:
+            return {metric: 0.0 for metric in (
+                "response_quality", "technical_accuracy", "communication_clarity",
+                "problem_solving", "context_understanding"
+            )}
+        
+        return {
+            "response_quality": quality_indicators / (3 * assistant_count),
+            "technical_accuracy": technical_score / assistant_count,
+            "communication_clarity": min(1.0, clarity_score / assistant_count),
+            "problem_solving": min(1.0, problem_solving_score / assistant_count),
+            "context_understanding": min(1.0, context_score) if len(messages) >= 2 else 0.0
+        }
     
-    def _generate_clarity_feedback(self, score: float) -> str:
-        """Generate communication clarity feedback"""
-        if score >= 0.8:
-            return "Excellent communication clarity with well-structured and understandable responses."
-        elif score >= 0.6:
-            return "Good communication clarity with clear and coherent explanations."
-        elif score >= 0.4:
-            return "Fair communication clarity, consider improving sentence structure and explanations."
-        else:
-            return "Communication clarity needs improvement. Focus on clearer explanations and structure."
+    @staticmethod
+    @lru_cache(maxsize=16)
+    def _role_scorer(agent_role: str) -> Tuple[Tuple[str, ...], Callable[[FrozenSet[str]], float]]:
+        """Keywords to scan and the technical-accuracy scorer, specialised once per role"""
+        role_keywords = AgentEvaluationService._ROLE_KEYWORDS.get(agent_role)
+        common_keywords = AgentEvaluationService._COMMON_KEYWORDS
+        if not role_keywords:
+            return tuple(common_keywords), lambda matched: 0.5
+        
+        # Scan the shared buckets plus this role's domain terms only
+        keyword_count = len(role_keywords)
+        
+        def score(matched: FrozenSet[str]) -> float:
+            return min(1.0, len(matched & role_keywords) / keyword_count)
+        
+        return tuple(common_keywords | role_keywords), score
     
-    def _generate_problem_solving_feedback(self, score: float) -> str:
-        """Generate problem-solving feedback"""
-        if score >= 0.8:
-            return "Excellent problem-solving approach with systematic and strategic thinking."
-        elif score >= 0.6:
-            return "Good problem-solving approach with logical reasoning and suggestions."
-        elif score >= 0.4:
-            return "Fair problem-solving approach, consider providing more structured solutions."
-        else:
-            return "Problem-solving approach needs improvement. Focus on systematic solution development."
+    @staticmethod
+    def _match_keywords(content_lower: str, keywords: Tuple[str, ...]) -> FrozenSet[str]:
+        """Return the keywords that occur in already-lowercased content
+
+        Plain substring checks use CPython's fast string search, which beats a
+        compiled alternation regex for a keyword list of this size.
+        """
+        return frozenset(keyword for keyword in keywords if keyword in content_lower)
     
-    def _generate_user_satisfaction_feedback(self, score: float) -> str:
-        """Generate user satisfaction feedback"""
-        if score >= 0.8:
-            return "High user satisfaction with positive feedback and engagement."
-        elif score >= 0.6:
-            return "Good user satisfaction with generally positive interactions."
-        elif score >= 0.4:
-            return "Fair user satisfaction, consider improving user experience and engagement."
-        else:
-            return "User satisfaction needs improvement. Focus on better user experience and interaction."
+    def _generate_feedback(self, metric: EvaluationMetric, score: float, **fields: Any) -> str:
+        """Pick the feedback message for the highest threshold the score reaches"""
+        table = self._FEEDBACK[metric]
+        message = next((message for threshold, message in table[:-1] if score >= threshold), table[-1][1])
+        return message.format(**fields) if fields else message
     
     def _generate_response_time_feedback(self, avg_time: float) -> str:
-        """Generate response time feedback"""
-        if avg_time <= 2.0:
-            return f"Excellent response time ({avg_time:.1f}s) with quick and efficient responses."
-        elif avg_time <= 5.0:
-            return f"Good response time ({avg_time:.1f}s) with reasonable response speed."
-        elif avg_time <= 10.0:
-            return f"Fair response time ({avg_time:.1f}s), consider optimizing for faster responses."
-        else:
-            return f"Response time needs improvement ({avg_time:.1f}s). Focus on faster response generation."
-    
-    def _generate_context_feedback(self, score: float) -> str:
-        """Generate context understanding feedback"""
-        if score >= 0.8:
-            return "Excellent context understanding with strong conversation memory and continuity."
-        elif score >= 0.6:
-            return "Good context understanding with adequate conversation awareness."
-        elif score >= 0.4:
-            return "Fair context understanding, consider improving conversation continuity."
-        else:
-            return "Context understanding needs improvement. Focus on better conversation memory."
+        """Generate response time feedback (lower is better)"""
+        table = self._RESPONSE_TIME_FEEDBACK
+        message = next((message for limit, message in table[:-1] if avg_time <= limit), table[-1][1])
+        return message.format(avg_time=avg_time)
     
     def _identify_strengths(self, scores: List[EvaluationScore]) -> List[str]:
         """Identify agent strengths"""
-        strengths = []
-        
-        for score in scores:
-            if score.score >= 0.8:
-                strengths.append(f"Strong {score.metric.value.replace('_', ' ')}")
-        
-        return strengths if strengths else ["Consistent performance across all metrics"]
+        return [
+            f"Strong {_METRIC_LABELS[score.metric]}" for score in scores if score.score >= 0.8
+        ] or ["Consistent performance across all metrics"]
     
     def _identify_improvements(self, scores: List[EvaluationScore]) -> List[str]:
         """Identify areas for improvement"""
-        improvements = []
-        
-        for score in scores:
-            if score.score < 0.6:
-                improvements.append(f"Improve {score.metric.value.replace('_', ' ')}")
-        
-        return improvements if improvements else ["Maintain current performance levels"]
+        return [
+            f"Improve {_METRIC_LABELS[score.metric]}" for score in scores if score.score < 0.6
+        ] or ["Maintain current performance levels"]
     
     def _generate_recommendations(self, scores: List[EvaluationScore], agent_role: str) -> List[str]:
         """Generate specific recommendations"""
         recommendations = []
         
         # Find lowest scoring metrics
-        lowest_scores = sorted(scores, key=lambda x: x.score)[:2]
+        lowest_scores = heapq.nsmallest(2, scores, key=lambda x: x.score)
         
         for score in lowest_scores:
             if score.metric == EvaluationMetric.TECHNICAL_ACCURACY:
@@ -440,6 +482,54 @@ class AgentEvaluationService:
         
         return recommendations if recommendations else ["Continue current performance trajectory"]
     
+    async def _ensure_index(self) -> None:
+        """Create or migrate the evaluation index once per process, in a worker thread"""
+        if self.index_path not in _initialized_indexes:
+            await asyncio.to_thread(self._init_index)
+    
+    def _init_index(self) -> None:
+        """Create the evaluation index, backfilling it from existing JSON files on first use"""
+        with _index_init_lock:
+            if self.index_path in _initialized_indexes:
+                return
+            with closing(sqlite3.connect(self.index_path)) as conn, conn:
+                columns = {row[1] for row in conn.execute("PRAGMA table_info(evals)")}
+                if columns and "evaluation_epoch" not in columns:
+                    # Index predates epoch filtering; rebuild it from the JSON files
+                    conn.execute("DROP TABLE evals")
+                    columns = set()
+                for statement in _INDEX_SCHEMA:
+                    conn.execute(statement)
+                if not columns:
+                    rows = []
+                    for evaluation_file in self.evaluations_dir.glob("*_evaluation.json"):
+                        try:
+                            rows.append(self._index_row(evaluation_file, orjson.loads(evaluation_file.read_bytes())))
+                        except Exception as e:
+                            logger.warning("Error loading evaluation %s: %s", evaluation_file, e, exc_info=True)
+                    conn.executemany(_INDEX_UPSERT, rows)
+            _initialized_indexes.add(self.index_path)
+    
+    @staticmethod
+    def _index_row(evaluation_file: Path, eval_data: Dict[str, Any]) -> Tuple[Any, ...]:
+        """Index columns for one saved evaluation"""
+        evaluation_epoch = eval_data.get("evaluation_epoch")
+        if evaluation_epoch is None:
+            # Files written before the epoch field was stored
+            evaluation_epoch = datetime.fromisoformat(eval_data["evaluation_date"]).timestamp()
+        
+        return (
+            str(evaluation_file),
+            eval_data["agent_role"],
+            eval_data["user_email"],
+            eval_data["evaluation_date"],
+            evaluation_epoch,
+            eval_data["overall_score"],
+            orjson.dumps(eval_data.get("strengths", [])).decode(),
+            orjson.dumps(eval_data.get("improvements", [])).decode(),
+            orjson.dumps(eval_data.get("recommendations", [])).decode()
+        )
+    
     async def _save_evaluation(self, evaluation: AgentEvaluation) -> None:
         """Save evaluation to disk"""
         evaluation_file = self.evaluations_dir / f"{evaluation.conversation_id}_evaluation.json"
@@ -451,11 +541,11 @@ class AgentEvaluationService:
             "overall_score": evaluation.overall_score,
             "individual_scores": [
                 {
-                    "metric": score.metric.value,
+                    "metric": score.metric,
                     "score": score.score,
                     "weight": score.weight,
                     "feedback": score.feedback,
-                    "timestamp": score.timestamp.isoformat()
+                    "timestamp": score.timestamp
                 }
                 for score in evaluation.individual_scores
             ],
@@ -463,11 +553,37 @@ class AgentEvaluationService:
             "improvements": evaluation.improvements,
             "recommendations": evaluation.recommendations,
             "evaluation_date": evaluation.evaluation_date.isoformat(),
+            "evaluation_epoch": evaluation.evaluation_date.timestamp(),
             "evaluator_type": evaluation.evaluator_type
         }
         
-        with open(evaluation_file, 'w', encoding='utf-8') as f:
-            json.dump(evaluation_data, f, indent=2)
+        # Concurrent saves are coalesced into one thread hop and one index transaction
+        await self._ensure_index()
+        await _evaluation_writer.process((self.index_path, evaluation_file, evaluation_data))
+    
+    @classmethod
+    async def _write_evaluation_batch(cls, items: List[Tuple[Path, Path, Dict[str, Any]]]) -> List[None]:
+        """Write a batch of evaluation files and their index rows off the event loop"""
+        await asyncio.to_thread(cls._write_evaluations, items)
+        return [None] * len(items)
+    
+    @classmethod
+    def _write_evaluations(cls, items: List[Tuple[Path, Path, Dict[str, Any]]]) -> None:
+        """Write evaluation files, then upsert their index rows per index database"""
+        rows_by_index: Dict[Path, List[Tuple[Any, ...]]] = {}
+        for index_path, evaluation_file, evaluation_data in items:
+            # Compact output; orjson serialises the score enums and datetimes natively
+            evaluation_file.write_bytes(orjson.dumps(evaluation_data))
+            rows_by_index.setdefault(index_path, []).append(cls._index_row(evaluation_file, evaluation_data))
+        
+        for index_path, rows in rows_by_index.items():
+            with closing(sqlite3.connect(index_path)) as conn, conn:
+                conn.executemany(_INDEX_UPSERT, rows)
+    
+    def _query_index(self, query: str, params: List[Any]) -> List[Tuple[Any, ...]]:
+        """Run a read query against the evaluation index"""
+        with closing(sqlite3.connect(self.index_path)) as conn:
+            return conn.execute(query, params).fetchall()
     
     async def get_agent_performance_summary(
         self, 
@@ -477,39 +593,48 @@ class AgentEvaluationService:
     ) -> Dict[str, Any]:
         """Get performance summary for an agent"""
         
-        cutoff_date = datetime.now() - timedelta(days=days)
-        evaluations = []
+        cutoff_epoch = (datetime.now() - timedelta(days=days)).timestamp()
         
-        # Load all evaluations for the agent
-        for evaluation_file in self.evaluations_dir.glob("*_evaluation.json"):
-            try:
-                with open(evaluation_file, 'r', encoding='utf-8') as f:
-                    eval_data = json.load(f)
-                
-                if eval_data["agent_role"] == agent_role:
-                    if user_email is None or eval_data["user_email"] == user_email:
-                        eval_date = datetime.fromisoformat(eval_data["evaluation_date"])
-                        if eval_date >= cutoff_date:
-                            evaluations.append(eval_data)
-            except Exception as e:
-                print(f"Error loading evaluation {evaluation_file}: {e}")
-                continue
+        # One indexed query instead of reading every evaluation file
+        query = (
+            "SELECT overall_score, evaluation_date, strengths_json, improvements_json, recommendations_json "
+            "FROM evals WHERE agent_role = ?"
+        )
+        params: List[Any] = [agent_role]
+        if user_email is not None:
+            query += " AND user_email = ?"
+            params.append(user_email)
+        query += " AND evaluation_epoch >= ? ORDER BY evaluation_epoch"
+        params.append(cutoff_epoch)
+        
+        await self._ensure_index()
+        rows = await asyncio.to_thread(self._query_index, query, params)
         
-        if not evaluations:
+        if not rows:
             return {"message": "No evaluations found for the specified criteria"}
         
-        # Calculate summary statistics
-        overall_scores = [eval_data["overall_score"] for eval_data in evaluations]
+        evaluations = [
+            {
+                "evaluation_date": evaluation_date,
+                "strengths": orjson.loads(strengths),
+                "improvements": orjson.loads(improvements),
+                "recommendations": orjson.loads(recommendations)
+            }
+            for _, evaluation_date, strengths, improvements, recommendations in rows
+        ]
+        
+        # Calculate summary statistics (rows are already in date order)
+        scores = np.fromiter((row[0] for row in rows), dtype=np.float64, count=len(rows))
         
         summary = {
             "agent_role": agent_role,
             "user_email": user_email,
             "period_days": days,
             "total_evaluations": len(evaluations),
-            "average_score": sum(overall_scores) / len(overall_scores),
-            "highest_score": max(overall_scores),
-            "lowest_score": min(overall_scores),
-            "score_trend": self._calculate_score_trend(evaluations),
+            "average_score": float(scores.mean()),
+            "highest_score": float(scores.max()),
+            "lowest_score": float(scores.min()),
+            "score_trend": self._calculate_score_trend(scores),
             "common_strengths": self._get_common_items(evaluations, "strengths"),
             "common_improvements": self._get_common_items(evaluations, "improvements"),
             "top_recommendations": self._get_common_items(evaluations, "recommendations"),
@@ -518,18 +643,13 @@ class AgentEvaluationService:
         
         return summary
     
-    def _calculate_score_trend(self, evaluations: List[Dict[str, Any]]) -> str:
-        """Calculate score trend over time"""
-        if len(evaluations) < 2:
+    def _calculate_score_trend(self, sorted_scores: np.ndarray) -> str:
+        """Calculate score trend over time from scores ordered oldest first"""
+        if len(sorted_scores) < 2:
             return "insufficient_data"
         
-        # Sort by date
-        sorted_evals = sorted(evaluations, key=lambda x: x["evaluation_date"])
-        recent_scores = [eval_data["overall_score"] for eval_data in sorted_evals[-3:]]
-        older_scores = [eval_data["overall_score"] for eval_data in sorted_evals[:3]]
-        
-        recent_avg = sum(recent_scores) / len(recent_scores)
-        older_avg = sum(older_scores) / len(older_scores)
+        recent_avg = sorted_scores[-3:].mean()
+        older_avg = sorted_scores[:3].mean()
         
         if recent_avg > older_avg + 0.1:
             return "improving"
@@ -540,15 +660,15 @@ class AgentEvaluationService:
     
     def _get_common_items(self, evaluations: List[Dict[str, Any]], field: str) -> List[str]:
         """Get most common items from evaluations"""
-        all_items = []
+        item_counts = Counter()
         for eval_data in evaluations:
-            all_items.extend(eval_data.get(field, []))
-        
-        # Count occurrences
-        item_counts = {}
-        for item in all_items:
-            item_counts[item] = item_counts.get(item, 0) + 1
+            item_counts.update(eval_data.get(field, ()))
         
-        # Return most common items
-        sorted_items = sorted(item_counts.items(), key=lambda x: x[1], reverse=True)
-        return [item for item, count in sorted_items[:5]]
+        return [item for item, _ in item_counts.most_common(5)]
+
+# Shared by all service instances (the endpoints build one per request)
+_evaluation_writer = AsyncBatcher(
+    AgentEvaluationService._write_evaluation_batch,
+    max_batch_size=EVALUATION_WRITE_BATCH_SIZE,
+    batch_wait_timeout_s=EVALUATION_WRITE_WAIT_S
+)
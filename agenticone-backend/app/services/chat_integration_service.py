@@ -3,25 +3,58 @@ Chat Integration Service for AgenticOne
 Captures and processes chat conversations from agents for report generation
 """
 
+import asyncio
 import json
+import logging
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from functools import cached_property, lru_cache
+from typing import Dict, List, Any, Optional, Tuple
 from pathlib import Path
 
+import aiofiles
+import orjson
+
 from app.services.vertex_ai_service import VertexAIService
 from app.services.report_generator import ReportGenerator
 from app.services.pdf_report_generator import PDFReportGenerator
+from app.services.conversation_index import get_conversation_index
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=4096)
+def _display_name_from_email(email: str) -> str:
+    """Readable name derived from the local part of an email address"""
+    return email.split('@', 1)[0].replace('.', ' ').title()
 
 
 class ChatIntegrationService:
     """Service to integrate chat conversations with report generation"""
     
+    # (keyword, finding) pairs for the manual fallback extractor
+    _FINDING_KEYWORDS = (
+        ("analysis", "Analysis completed by specialist"),
+        ("assessment", "Assessment performed"),
+        ("evaluation", "Evaluation conducted"),
+    )
+    
     def __init__(self):
-        self.vertex_ai_service = VertexAIService()
-        self.report_generator = ReportGenerator()
-        self.pdf_report_generator = PDFReportGenerator()
         self.conversations_dir = Path("conversations")
         self.conversations_dir.mkdir(exist_ok=True)
+        self.conversation_index = get_conversation_index(self.conversations_dir)
+    
+    # Heavy clients are built on first use, so listing and reading conversations never pay for them
+    @cached_property
+    def vertex_ai_service(self) -> VertexAIService:
+        return VertexAIService()
+    
+    @cached_property
+    def report_generator(self) -> ReportGenerator:
+        return ReportGenerator()
+    
+    @cached_property
+    def pdf_report_generator(self) -> PDFReportGenerator:
+        return PDFReportGenerator()
     
     async def capture_chat_conversation(
         self,
@@ -34,12 +67,13 @@ class ChatIntegrationService:
     ) -> Dict[str, Any]:
         """Capture a chat conversation for later report generation"""
         
+        now = datetime.now()
         if not conversation_id:
-            conversation_id = f"{specialist_type}_chat_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            conversation_id = f"{specialist_type}_chat_{now.strftime('%Y%m%d_%H%M%S')}"
         
         # Extract user name from email if not provided
         if not user_name:
-            user_name = user_email.split('@')[0].replace('.', ' ').title()
+            user_name = _display_name_from_email(user_email)
         
         conversation_data = {
             "conversation_id": conversation_id,
@@ -48,16 +82,19 @@ class ChatIntegrationService:
             "agent_response": agent_response,
             "user_email": user_email,
             "user_name": user_name,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now.isoformat(),
             "processed": False
         }
         
         # Save conversation
-        conversation_file = self.conversations_dir / f"{conversation_id}.json"
-        with open(conversation_file, 'w', encoding='utf-8') as f:
-            json.dump(conversation_data, f, indent=2)
+        conversation_file = (
+            await self.conversation_index.locate(conversation_id)
+            or self.conversation_index.shard_path(conversation_id, now)
+        )
+        await self._write_conversation(conversation_file, conversation_data)
+        await self.conversation_index.upsert(conversation_file, conversation_data)
         
-        print(f"💬 Chat conversation captured: {conversation_id}")
+        logger.info("💬 Chat conversation captured: %s", conversation_id)
         return conversation_data
     
     async def generate_report_from_conversation(
@@ -69,12 +106,7 @@ class ChatIntegrationService:
         """Generate report from captured chat conversation"""
         
         # Load conversation
-        conversation_file = self.conversations_dir / f"{conversation_id}.json"
-        if not conversation_file.exists():
-            raise ValueError(f"Conversation {conversation_id} not found")
-        
-        with open(conversation_file, 'r', encoding='utf-8') as f:
-            conversation = json.load(f)
+        conversation_file, conversation = await self._load_conversation(conversation_id)
         
         # Extract conversation data
         specialist_type = conversation["specialist_type"]
@@ -87,51 +119,48 @@ class ChatIntegrationService:
             specialist_type, user_message, agent_response
         )
         
-        results = {}
-        
-        # Generate HTML report if requested
+        # Generate the requested formats concurrently
+        generators = {}
         if report_format in ["html", "both"]:
-            try:
-                html_report = await self.report_generator.generate_specialist_report(
-                    specialist_type=specialist_type,
-                    analysis_data=analysis_data,
-                    customer_request=customer_request,
-                    user_email=user_email
-                )
-                results["html_report"] = html_report
-                print(f"✅ HTML report generated from conversation: {conversation_id}")
-            except Exception as e:
-                print(f"❌ HTML report generation failed: {e}")
-                results["html_error"] = str(e)
-        
-        # Generate PDF report if requested
+            generators["html"] = self.report_generator.generate_specialist_report(
+                specialist_type=specialist_type,
+                analysis_data=analysis_data,
+                customer_request=customer_request,
+                user_email=user_email
+            )
         if report_format in ["pdf", "both"]:
-            try:
-                pdf_report = await self.pdf_report_generator.generate_specialist_pdf_report(
-                    specialist_type=specialist_type,
-                    analysis_data=analysis_data,
-                    customer_request=customer_request,
-                    user_email=user_email,
-                    user_name=conversation.get("user_name", user_email.split('@')[0].replace('.', ' ').title())
-                )
-                results["pdf_report"] = pdf_report
-                print(f"✅ PDF report generated from conversation: {conversation_id}")
-            except Exception as e:
-                print(f"❌ PDF report generation failed: {e}")
-                results["pdf_error"] = str(e)
+            generators["pdf"] = self.pdf_report_generator.generate_specialist_pdf_report(
+                specialist_type=specialist_type,
+                analysis_data=analysis_data,
+                customer_request=customer_request,
+                user_email=user_email,
+                user_name=conversation.get("user_name") or _display_name_from_email(user_email)
+            )
+        
+        reports = await asyncio.gather(*generators.values(), return_exceptions=True)
+        
+        results = {}
+        for fmt, report in zip(generators, reports):
+            if isinstance(report, Exception):
+                logger.error("❌ %s report generation failed: %s", fmt.upper(), report)
+                results[f"{fmt}_error"] = str(report)
+            else:
+                results[f"{fmt}_report"] = report
+                logger.info("✅ %s report generated from conversation: %s", fmt.upper(), conversation_id)
         
         # Mark conversation as processed
+        processed_at = datetime.now().isoformat()
         conversation["processed"] = True
-        conversation["processed_at"] = datetime.now().isoformat()
-        with open(conversation_file, 'w', encoding='utf-8') as f:
-            json.dump(conversation, f, indent=2)
+        conversation["processed_at"] = processed_at
+        await self._write_conversation(conversation_file, conversation)
+        await self.conversation_index.upsert(conversation_file, conversation)
         
         return {
             "conversation_id": conversation_id,
             "specialist_type": specialist_type,
             "customer_request": customer_request,
             "results": results,
-            "generated_at": datetime.now().isoformat()
+            "generated_at": processed_at
         }
     
     async def _extract_analysis_from_conversation(
@@ -161,12 +190,12 @@ class ChatIntegrationService:
         
         try:
             # Use Vertex AI to analyze the conversation
-            ai_analysis = await self.vertex_ai_service.generate_text(analysis_prompt)
+            ai_analysis = await self.vertex_ai_service.generate_text_cached(analysis_prompt)
             
             # Try to parse JSON response
             try:
                 analysis_data = json.loads(ai_analysis)
-                print(f"🤖 AI analysis extracted from conversation")
+                logger.info("🤖 AI analysis extracted from conversation")
                 return analysis_data
             except json.JSONDecodeError:
                 # Fallback to manual extraction
@@ -175,7 +204,7 @@ class ChatIntegrationService:
                 )
                 
         except Exception as e:
-            print(f"⚠️ AI analysis failed, using manual extraction: {e}")
+            logger.warning("⚠️ AI analysis failed, using manual extraction: %s", e)
             return await self._manual_extraction_from_conversation(
                 specialist_type, user_message, agent_response
             )
@@ -188,26 +217,16 @@ class ChatIntegrationService:
     ) -> Dict[str, Any]:
         """Manually extract analysis data from conversation when AI fails"""
         
-        # Extract key information from the agent response
-        findings = []
-        recommendations = []
+        # Extract key information from the agent response, lowercased once
+        response_lower = agent_response.lower()
         technical_details = agent_response
         
         # Look for common patterns in agent responses
-        if "recommend" in agent_response.lower():
-            recommendations.append("Follow agent recommendations")
-        if "risk" in agent_response.lower():
-            risk_level = "Medium"
-        else:
-            risk_level = "Low"
+        recommendations = ["Follow agent recommendations"] if "recommend" in response_lower else []
+        risk_level = "Medium" if "risk" in response_lower else "Low"
         
         # Extract findings based on response content
-        if "analysis" in agent_response.lower():
-            findings.append("Analysis completed by specialist")
-        if "assessment" in agent_response.lower():
-            findings.append("Assessment performed")
-        if "evaluation" in agent_response.lower():
-            findings.append("Evaluation conducted")
+        findings = [finding for keyword, finding in self._FINDING_KEYWORDS if keyword in response_lower]
         
         return {
             "findings": findings if findings else ["Specialist consultation completed"],
@@ -218,26 +237,33 @@ class ChatIntegrationService:
             "next_steps": ["Review specialist recommendations", "Implement suggested actions"]
         }
     
-    async def list_conversations(self) -> List[Dict[str, Any]]:
-        """List all captured conversations"""
-        conversations = []
-        
-        for conversation_file in self.conversations_dir.glob("*.json"):
-            try:
-                with open(conversation_file, 'r', encoding='utf-8') as f:
-                    conversation = json.load(f)
-                conversations.append(conversation)
-            except Exception as e:
-                print(f"Error loading conversation {conversation_file}: {e}")
-        
-        return sorted(conversations, key=lambda x: x.get('timestamp', ''), reverse=True)
+    async def list_conversations(self, limit: int = 50, offset: int = 0) -> List[Dict[str, Any]]:
+        """List summaries of one page of captured conversations, newest first"""
+        return await self.conversation_index.list(limit, offset)
     
     async def get_conversation(self, conversation_id: str) -> Dict[str, Any]:
         """Get a specific conversation by ID"""
-        conversation_file = self.conversations_dir / f"{conversation_id}.json"
-        
-        if not conversation_file.exists():
-            raise ValueError(f"Conversation {conversation_id} not found")
-        
-        with open(conversation_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        _, conversation = await self._load_conversation(conversation_id)
+        return conversation
+    
+    async def _load_conversation(self, conversation_id: str) -> Tuple[Path, Dict[str, Any]]:
+        """Path and contents of a saved conversation, raising if there is none"""
+        conversation_file = await self.conversation_index.locate(conversation_id)
+        if conversation_file is not None:
+            try:
+                return conversation_file, await self._read_conversation(conversation_file)
+            except FileNotFoundError:
+                pass
+        raise ValueError(f"Conversation {conversation_id} not found")
+    
+    @staticmethod
+    async def _read_conversation(conversation_file: Path) -> Dict[str, Any]:
+        """Load a conversation file without blocking the event loop"""
+        async with aiofiles.open(conversation_file, 'rb') as f:
+            return orjson.loads(await f.read())
+    
+    @staticmethod
+    async def _write_conversation(conversation_file: Path, conversation: Dict[str, Any]):
+        """Save a conversation file without blocking the event loop"""
+        async with aiofiles.open(conversation_file, 'wb') as f:
+            await f.write(orjson.dumps(conversation, option=orjson.OPT_INDENT_2))
@@ -0,0 +1,139 @@
+"""
+SQLite index of saved chat conversations
+"""
+import asyncio
+import logging
+import sqlite3
+import threading
+from contextlib import closing
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+# SQLite index of saved conversations, kept next to the JSON files
+CONVERSATION_INDEX_FILE = "index.db"
+
+# Listing columns; the full conversation stays in its JSON file
+_LISTING_COLUMNS = ("conversation_id", "specialist_type", "user_email", "user_name", "timestamp", "processed")
+
+_INDEX_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS conversations (
+        conversation_id TEXT PRIMARY KEY,
+        path TEXT NOT NULL,
+        specialist_type TEXT,
+        user_email TEXT,
+        user_name TEXT,
+        timestamp TEXT NOT NULL,
+        processed INTEGER NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS conversations_timestamp ON conversations (timestamp DESC)"
+)
+
+_INDEX_UPSERT = """INSERT OR REPLACE INTO conversations (
+    conversation_id, path, specialist_type, user_email, user_name, timestamp, processed
+) VALUES (?, ?, ?, ?, ?, ?, ?)"""
+
+
+class ConversationIndex:
+    """Lists and locates conversations with indexed queries instead of scanning JSON files
+
+    New conversation files are sharded into ``YYYY/MM/DD`` subdirectories so no
+    single directory grows unbounded; the index records where each one lives.
+    Files saved flat before sharding stay where they are and are found the same way.
+    The database is opened lazily, off the event loop, the first time it is queried.
+    """
+
+    def __init__(self, conversations_dir: Path):
+        self.conversations_dir = conversations_dir
+        self.index_path = conversations_dir / CONVERSATION_INDEX_FILE
+        self._initialized = False
+        self._init_lock = threading.Lock()
+
+    async def _ensure_index(self) -> None:
+        """Create or migrate the index once, in a worker thread"""
+        if not self._initialized:
+            await asyncio.to_thread(self._init_index)
+
+    def _init_index(self) -> None:
+        """Create the conversation index, backfilling it from existing JSON files on first use"""
+        with self._init_lock:
+            if self._initialized:
+                return
+            with closing(sqlite3.connect(self.index_path)) as conn, conn:
+                columns = {row[1] for row in conn.execute("PRAGMA table_info(conversations)")}
+                if columns and ("path" not in columns or "data_json" in columns):
+                    # Index predates sharding or still stores whole conversations; rebuild it
+                    conn.execute("DROP TABLE conversations")
+                    columns = set()
+                for statement in _INDEX_SCHEMA:
+                    conn.execute(statement)
+                if not columns:
+                    rows = []
+                    for conversation_file in self.conversations_dir.rglob("*.json"):
+                        try:
+                            rows.append(self._index_row(conversation_file, orjson.loads(conversation_file.read_bytes())))
+                        except Exception as e:
+                            logger.warning("Error loading conversation %s: %s", conversation_file, e)
+                    conn.executemany(_INDEX_UPSERT, rows)
+            self._initialized = True
+
+    @staticmethod
+    def _index_row(conversation_file: Path, conversation: Dict[str, Any]) -> Tuple[Any, ...]:
+        """Index columns for one saved conversation"""
+        return (
+            conversation_file.stem,
+            str(conversation_file),
+            conversation.get("specialist_type"),
+            conversation.get("user_email"),
+            conversation.get("user_name"),
+            conversation.get("timestamp", ""),
+            int(bool(conversation.get("processed", False)))
+        )
+
+    def _execute(self, query: str, params: Tuple[Any, ...]) -> List[Tuple[Any, ...]]:
+        """Run one statement against the index and return its rows"""
+        with closing(sqlite3.connect(self.index_path)) as conn, conn:
+            return conn.execute(query, params).fetchall()
+
+    def shard_path(self, conversation_id: str, when: datetime) -> Path:
+        """Date-sharded location for a new conversation file, creating its directory"""
+        shard_dir = self.conversations_dir / when.strftime("%Y/%m/%d")
+        shard_dir.mkdir(parents=True, exist_ok=True)
+        return shard_dir / f"{conversation_id}.json"
+
+    async def locate(self, conversation_id: str) -> Optional[Path]:
+        """Path of a saved conversation file, or None if it was never indexed"""
+        await self._ensure_index()
+        rows = await asyncio.to_thread(
+            self._execute, "SELECT path FROM conversations WHERE conversation_id = ?", (conversation_id,)
+        )
+        return Path(rows[0][0]) if rows else None
+
+    async def upsert(self, conversation_file: Path, conversation: Dict[str, Any]) -> None:
+        """Add or refresh a conversation's index row"""
+        await self._ensure_index()
+        await asyncio.to_thread(self._execute, _INDEX_UPSERT, self._index_row(conversation_file, conversation))
+
+    async def list(self, limit: Optional[int] = None, offset: int = 0) -> List[Dict[str, Any]]:
+        """Summaries of one page of saved conversations, newest first"""
+        await self._ensure_index()
+        rows = await asyncio.to_thread(
+            self._execute,
+            f"SELECT {', '.join(_LISTING_COLUMNS)} FROM conversations ORDER BY timestamp DESC LIMIT ? OFFSET ?",
+            (-1 if limit is None else limit, offset)
+        )
+        summaries = [dict(zip(_LISTING_COLUMNS, row)) for row in rows]
+        for summary in summaries:
+            summary["processed"] = bool(summary["processed"])
+        return summaries
+
+
+@lru_cache(maxsize=None)
+def get_conversation_index(conversations_dir: Path) -> ConversationIndex:
+    """Shared index for a conversations directory, so services built per request reuse it"""
+    return ConversationIndex(conversations_dir)
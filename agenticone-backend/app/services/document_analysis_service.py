@@ -3,29 +3,28 @@ Document Analysis Service for AgenticOne
 Analyzes uploaded inspection reports and images using Vertex AI to generate insights
 """
 
+import asyncio
 import json
-import base64
+import logging
 from datetime import datetime
-from typing import Dict, List, Any, Optional, Tuple
-from pathlib import Path
+from functools import cached_property
+from typing import Dict, List, Any, Optional
 
 from app.services.vertex_ai_service import VertexAIService
 from app.services.rag_service import RAGService
 from app.services.multi_format_report_generator import MultiFormatReportGenerator
+from app.utils.helpers import extract_json_object
 
+logger = logging.getLogger(__name__)
 
-class DocumentAnalysisService:
-    """Service for analyzing uploaded documents and generating insights"""
-    
-    def __init__(self):
-        self.vertex_ai_service = VertexAIService()
-        self.rag_service = RAGService()
-        self.report_generator = MultiFormatReportGenerator()
-        
-        # Analysis prompts for different specialist types
-        self.analysis_prompts = {
-            "corrosion_engineer": {
-                "system_prompt": """You are a senior corrosion engineer with 20+ years of experience in oil & gas, marine, and industrial environments. Your expertise includes:
+# Generation settings for document analysis
+ANALYSIS_MAX_TOKENS = 2000
+ANALYSIS_TEMPERATURE = 0.3
+
+# Analysis prompts for different specialist types
+_ANALYSIS_PROMPTS = {
+    "corrosion_engineer": {
+        "system_prompt": """You are a senior corrosion engineer with 20+ years of experience in oil & gas, marine, and industrial environments. Your expertise includes:
 - Material degradation analysis
 - Corrosion mechanism identification
 - Risk assessment and mitigation strategies
@@ -33,8 +32,8 @@ class DocumentAnalysisService:
 - Industry standards (API, NACE, ISO, ASME)
 
 Analyze the uploaded inspection reports and images to provide professional insights.""",
-                
-                "analysis_framework": """
+        
+        "analysis_framework": """
 1. **Document Overview**: Summarize the inspection scope, equipment, and conditions
 2. **Corrosion Assessment**: Identify corrosion types, mechanisms, and severity
 3. **Risk Analysis**: Evaluate safety, environmental, and operational risks
@@ -42,10 +41,10 @@ Analyze the uploaded inspection reports and images to provide professional insig
 5. **Recommendations**: Immediate actions, monitoring, and long-term strategies
 6. **Compliance**: Standards adherence and regulatory requirements
 """
-            },
-            
-            "subsea_engineer": {
-                "system_prompt": """You are a senior subsea engineer with extensive experience in offshore operations, subsea systems, and underwater infrastructure. Your expertise includes:
+    },
+    
+    "subsea_engineer": {
+        "system_prompt": """You are a senior subsea engineer with extensive experience in offshore operations, subsea systems, and underwater infrastructure. Your expertise includes:
 - Subsea equipment design and operation
 - Underwater inspection techniques
 - ROV/AUV operations and data analysis
@@ -53,8 +52,8 @@ Analyze the uploaded inspection reports and images to provide professional insig
 - Subsea production systems
 
 Analyze the uploaded subsea inspection reports and images to provide professional insights.""",
-                
-                "analysis_framework": """
+        
+        "analysis_framework": """
 1. **System Overview**: Subsea infrastructure, components, and operational context
 2. **Structural Assessment**: Integrity, fatigue, and stress analysis
 3. **Environmental Factors**: Marine conditions, currents, and seabed conditions
@@ -62,10 +61,10 @@ Analyze the uploaded subsea inspection reports and images to provide professiona
 5. **Risk Evaluation**: Safety, environmental, and operational risks
 6. **Maintenance Strategy**: Inspection schedules, repair priorities, and optimization
 """
-            },
-            
-            "methods_specialist": {
-                "system_prompt": """You are a senior methods specialist with expertise in operational procedures, process optimization, and engineering methodologies. Your expertise includes:
+    },
+    
+    "methods_specialist": {
+        "system_prompt": """You are a senior methods specialist with expertise in operational procedures, process optimization, and engineering methodologies. Your expertise includes:
 - Process engineering and optimization
 - Safety management systems
 - Operational procedures and best practices
@@ -73,8 +72,8 @@ Analyze the uploaded subsea inspection reports and images to provide professiona
 - Quality assurance and compliance
 
 Analyze the uploaded operational reports and procedures to provide professional insights.""",
-                
-                "analysis_framework": """
+        
+        "analysis_framework": """
 1. **Process Overview**: Operational procedures, workflows, and methodologies
 2. **Performance Analysis**: Efficiency metrics, bottlenecks, and optimization opportunities
 3. **Safety Assessment**: Risk identification, mitigation strategies, and compliance
@@ -82,10 +81,10 @@ Analyze the uploaded operational reports and procedures to provide professional
 5. **Best Practices**: Industry standards, lessons learned, and improvements
 6. **Recommendations**: Process optimization, training needs, and system upgrades
 """
-            },
-            
-            "discipline_head": {
-                "system_prompt": """You are a senior discipline head with comprehensive experience in project management, technical leadership, and strategic planning. Your expertise includes:
+    },
+    
+    "discipline_head": {
+        "system_prompt": """You are a senior discipline head with comprehensive experience in project management, technical leadership, and strategic planning. Your expertise includes:
 - Project management and delivery
 - Technical team leadership
 - Strategic planning and resource allocation
@@ -93,8 +92,8 @@ Analyze the uploaded operational reports and procedures to provide professional
 - Stakeholder communication and reporting
 
 Analyze the uploaded project reports and technical documents to provide executive-level insights.""",
-                
-                "analysis_framework": """
+        
+        "analysis_framework": """
 1. **Project Overview**: Scope, objectives, timeline, and deliverables
 2. **Technical Assessment**: Engineering solutions, design integrity, and compliance
 3. **Resource Analysis**: Budget, schedule, personnel, and equipment utilization
@@ -102,8 +101,58 @@ Analyze the uploaded project reports and technical documents to provide executiv
 5. **Performance Metrics**: KPIs, milestones, and success criteria
 6. **Strategic Recommendations**: Resource allocation, process improvements, and future planning
 """
-            }
-        }
+    }
+}
+
+# Instructions appended after the documents in every analysis prompt
+_PROMPT_FOOTER = """
+
+## Analysis Framework:
+{analysis_framework}
+
+## Additional Parameters:
+{analysis_parameters}
+
+## Instructions:
+Please analyze the uploaded documents and provide a comprehensive assessment following the framework above. Focus on:
+
+1. **Technical Analysis**: Detailed examination of the data, measurements, and observations
+2. **Risk Assessment**: Identification and evaluation of potential risks and issues
+3. **Professional Insights**: Expert recommendations based on industry best practices
+4. **Actionable Recommendations**: Specific, implementable next steps
+
+Format your response as JSON with the following structure:
+{{
+    "summary": "Executive summary of the analysis",
+    "findings": ["Key finding 1", "Key finding 2", ...],
+    "risk_level": "Low/Medium/High",
+    "risk_reasoning": "Explanation of risk assessment",
+    "recommendations": ["Recommendation 1", "Recommendation 2", ...],
+    "technical_details": "Detailed technical analysis",
+    "next_steps": ["Next step 1", "Next step 2", ...],
+    "compliance_notes": "Relevant standards and compliance considerations"
+}}
+"""
+
+
+class DocumentAnalysisService:
+    """Service for analyzing uploaded documents and generating insights"""
+    
+    def __init__(self):
+        self.analysis_prompts = _ANALYSIS_PROMPTS
+    
+    # Heavy clients are built on first use rather than with every per-request instance
+    @cached_property
+    def vertex_ai_service(self) -> VertexAIService:
+        return VertexAIService()
+    
+    @cached_property
+    def rag_service(self) -> RAGService:
+        return RAGService()
+    
+    @cached_property
+    def report_generator(self) -> MultiFormatReportGenerator:
+        return MultiFormatReportGenerator()
     
     async def analyze_uploaded_documents(
         self,
@@ -127,32 +176,35 @@ Analyze the uploaded project reports and technical documents to provide executiv
             Analysis results with insights and recommendations
         """
         
-        print(f"🔍 Starting document analysis for {specialist_type}")
-        print(f"   Documents: {len(document_ids)}")
-        print(f"   User: {user_name or user_email}")
+        logger.info(
+            "🔍 Starting document analysis for %s (documents: %d, user: %s)",
+            specialist_type, len(document_ids), user_name or user_email
+        )
         
         # Get analysis configuration
         analysis_config = self.analysis_prompts.get(specialist_type, self.analysis_prompts["corrosion_engineer"])
         
-        # Retrieve and process documents
+        # Retrieve all documents concurrently, then keep the ones that loaded
+        retrieved = await asyncio.gather(
+            *(self._retrieve_document_content(doc_id) for doc_id in document_ids),
+            return_exceptions=True
+        )
+        
         document_contents = []
         document_metadata = []
         
-        for doc_id in document_ids:
-            try:
-                # Get document content from RAG service
-                doc_content = await self._retrieve_document_content(doc_id)
-                document_contents.append(doc_content)
-                document_metadata.append({
-                    "document_id": doc_id,
-                    "filename": doc_content.get("filename", "unknown"),
-                    "document_type": doc_content.get("document_type", "unknown"),
-                    "size": doc_content.get("size", 0)
-                })
-                print(f"✅ Retrieved document: {doc_content.get('filename', doc_id)}")
-            except Exception as e:
-                print(f"❌ Failed to retrieve document {doc_id}: {e}")
+        for doc_id, doc_content in zip(document_ids, retrieved):
+            if isinstance(doc_content, Exception):
+                logger.error("❌ Failed to retrieve document %s: %s", doc_id, doc_content)
                 continue
+            document_contents.append(doc_content)
+            document_metadata.append({
+                "document_id": doc_id,
+                "filename": doc_content.get("filename", "unknown"),
+                "document_type": doc_content.get("document_type", "unknown"),
+                "size": doc_content.get("size", 0)
+            })
+            logger.info("✅ Retrieved document: %s", doc_content.get('filename', doc_id))
         
         if not document_contents:
             raise ValueError("No documents could be retrieved for analysis")
@@ -166,17 +218,8 @@ Analyze the uploaded project reports and technical documents to provide executiv
             analysis_parameters=analysis_parameters
         )
         
-        # Perform AI analysis
-        print(f"🤖 Performing AI analysis with {specialist_type} expertise...")
-        ai_analysis = await self.vertex_ai_service.generate_text(
-            prompt=analysis_prompt,
-            system_prompt=analysis_config["system_prompt"],
-            max_tokens=2000,
-            temperature=0.3
-        )
-        
-        # Parse AI response
-        parsed_analysis = await self._parse_ai_analysis(ai_analysis, specialist_type)
+        # Perform AI analysis, reusing the result for an identical prompt
+        parsed_analysis = await self._analyze_with_cache(specialist_type, analysis_prompt, analysis_config)
         
         # Generate comprehensive report
         report_manifest = await self._generate_analysis_report(
@@ -187,10 +230,11 @@ Analyze the uploaded project reports and technical documents to provide executiv
             user_name=user_name
         )
         
-        print(f"✅ Document analysis completed successfully")
+        logger.info("✅ Document analysis completed successfully")
         
+        completed_at = datetime.now()
         return {
-            "analysis_id": f"{specialist_type}_analysis_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+            "analysis_id": f"{specialist_type}_analysis_{completed_at.strftime('%Y%m%d_%H%M%S')}",
             "specialist_type": specialist_type,
             "documents_analyzed": len(document_contents),
             "analysis_summary": parsed_analysis.get("summary", ""),
@@ -198,9 +242,29 @@ Analyze the uploaded project reports and technical documents to provide executiv
             "risk_level": parsed_analysis.get("risk_level", "Unknown"),
             "recommendations": parsed_analysis.get("recommendations", []),
             "report_manifest": report_manifest,
-            "generated_at": datetime.now().isoformat()
+            "generated_at": completed_at.isoformat()
         }
     
+    async def _analyze_with_cache(
+        self,
+        specialist_type: str,
+        analysis_prompt: str,
+        analysis_config: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Run the AI analysis for a prompt, reusing the model output only for an identical prompt"""
+        
+        logger.info("🤖 Performing AI analysis with %s expertise...", specialist_type)
+        # Only the JSON object is parsed, so stop generating once it has closed
+        ai_analysis = await self.vertex_ai_service.generate_text_cached(
+            prompt=analysis_prompt,
+            system_prompt=analysis_config["system_prompt"],
+            max_tokens=ANALYSIS_MAX_TOKENS,
+            temperature=ANALYSIS_TEMPERATURE,
+            stop_when=lambda text: extract_json_object(text) is not None
+        )
+        
+        return await self._parse_ai_analysis(ai_analysis, specialist_type)
+    
     async def _retrieve_document_content(self, document_id: str) -> Dict[str, Any]:
         """Retrieve document content from the RAG service"""
         
@@ -233,63 +297,37 @@ Analyze the uploaded project reports and technical documents to provide executiv
     ) -> str:
         """Create comprehensive analysis prompt"""
         
-        prompt = f"""
+        # Collect the pieces and join once; += would recopy the prompt per document
+        parts = [f"""
 # {specialist_type.replace('_', ' ').title()} Document Analysis
 
 ## Documents to Analyze:
-"""
+"""]
         
-        for i, (content, metadata) in enumerate(zip(document_contents, document_metadata), 1):
-            prompt += f"""
+        parts.extend(
+            f"""
 ### Document {i}: {metadata['filename']}
 - **Type**: {metadata['document_type']}
 - **Size**: {metadata['size']} bytes
 - **Content**: {content.get('content', 'Document content not available')}
 """
+            for i, (content, metadata) in enumerate(zip(document_contents, document_metadata), 1)
+        )
         
-        prompt += f"""
-
-## Analysis Framework:
-{analysis_config['analysis_framework']}
-
-## Additional Parameters:
-{json.dumps(analysis_parameters or {}, indent=2)}
-
-## Instructions:
-Please analyze the uploaded documents and provide a comprehensive assessment following the framework above. Focus on:
-
-1. **Technical Analysis**: Detailed examination of the data, measurements, and observations
-2. **Risk Assessment**: Identification and evaluation of potential risks and issues
-3. **Professional Insights**: Expert recommendations based on industry best practices
-4. **Actionable Recommendations**: Specific, implementable next steps
-
-Format your response as JSON with the following structure:
-{{
-    "summary": "Executive summary of the analysis",
-    "findings": ["Key finding 1", "Key finding 2", ...],
-    "risk_level": "Low/Medium/High",
-    "risk_reasoning": "Explanation of risk assessment",
-    "recommendations": ["Recommendation 1", "Recommendation 2", ...],
-    "technical_details": "Detailed technical analysis",
-    "next_steps": ["Next step 1", "Next step 2", ...],
-    "compliance_notes": "Relevant standards and compliance considerations"
-}}
-"""
+        parts.append(_PROMPT_FOOTER.format(
+            analysis_framework=analysis_config['analysis_framework'],
+            analysis_parameters=json.dumps(analysis_parameters or {}, indent=2)
+        ))
         
-        return prompt
+        return "".join(parts)
     
     async def _parse_ai_analysis(self, ai_response: str, specialist_type: str) -> Dict[str, Any]:
         """Parse AI analysis response"""
         
-        try:
-            # Try to extract JSON from the response
-            import re
-            json_match = re.search(r'\{.*\}', ai_response, re.DOTALL)
-            if json_match:
-                parsed_data = json.loads(json_match.group())
-                return parsed_data
-        except json.JSONDecodeError:
-            pass
+        # Try to extract JSON from the response
+        parsed_data = extract_json_object(ai_response)
+        if parsed_data is not None:
+            return parsed_data
         
         # Fallback parsing if JSON extraction fails
         return {
@@ -329,18 +367,19 @@ Format your response as JSON with the following structure:
     ) -> Dict[str, Any]:
         """Generate comprehensive report from analysis"""
         
-        # Create conversation-like data for the report generator
+        # Create conversation-like data for the report generator; both turns describe one analysis
+        now_iso = datetime.now().isoformat()
         conversation_data = {
             "messages": [
                 {
                     "role": "user",
                     "content": f"Please analyze these {len(document_metadata)} uploaded inspection documents and provide a comprehensive assessment",
-                    "timestamp": datetime.now().isoformat()
+                    "timestamp": now_iso
                 },
                 {
                     "role": "assistant", 
                     "content": f"Analysis completed. {analysis_data.get('summary', 'Professional assessment performed')}",
-                    "timestamp": datetime.now().isoformat()
+                    "timestamp": now_iso
                 }
             ]
         }
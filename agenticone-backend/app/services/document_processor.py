@@ -1,10 +1,269 @@
 """
 Document Processor Service for handling various document types
 """
+import asyncio
+import codecs
+import copy
+import hashlib
 import io
 import mimetypes
-from typing import Dict, List, Any, Optional
-from datetime import datetime
+import multiprocessing
+import os
+import re
+import zipfile
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache, partial
+from typing import Dict, List, Any, Optional, Tuple
+from datetime import datetime, timezone
+
+from app.config import get_settings
+
+# Words ignored when extracting keywords
+_STOP_WORDS = frozenset({
+    "the", "a", "an", "and", "or", "but", "in", "on", "at", "to", "for",
+    "of", "with", "by", "is", "are", "was", "were", "be", "been", "have",
+    "has", "had", "do", "does", "did", "will", "would", "could", "should"
+})
+
+# Two or more consecutive lines containing a pipe or tab; anchoring on the first
+# separator leaves one way to match each line, so long lines scan in linear time
+_TABLE_BLOCK_RE = re.compile(r'(?:^[^\n|\t]*[|\t][^\n]*(?:\n|$)){2,}', re.MULTILINE)
+
+# (leading bytes, MIME type) checked in order when the filename gives no type
+_MAGIC_NUMBERS = (
+    (b'%PDF', "application/pdf"),
+    (b'\xff\xd8\xff', "image/jpeg"),
+    (b'\x89PNG', "image/png"),
+    (b'II*\x00', "image/tiff"),
+    (b'MM\x00*', "image/tiff")
+)
+
+@lru_cache(maxsize=1024)
+def _mime_type_for_extension(extension: str) -> Optional[str]:
+    """MIME type registered for a file extension, or None"""
+    return mimetypes.guess_type(f"file.{extension}")[0]
+
+# Bytes from each end of a file that Magika inspects
+MAGIKA_SAMPLE_BYTES = 4096
+
+_magika = None
+
+def _identify_with_magika(content: bytes) -> Optional[str]:
+    """MIME type predicted by Magika from the start and end of the content, or None"""
+    global _magika
+    if _magika is None:
+        from magika import Magika
+        _magika = Magika()
+    
+    if len(content) > 2 * MAGIKA_SAMPLE_BYTES:
+        content = content[:MAGIKA_SAMPLE_BYTES] + content[-MAGIKA_SAMPLE_BYTES:]
+    mime_type = _magika.identify_bytes(content).output.mime_type
+    return None if mime_type == "application/octet-stream" else mime_type
+
+# PDF parsing is CPU-bound, so it runs in worker processes shared by every processor
+_pdf_pool: Optional[ProcessPoolExecutor] = None
+
+# PDFs arriving together are parsed in one worker dispatch, amortizing pickling and IPC
+PDF_BATCH_SIZE = 16
+PDF_BATCH_MAX_DELAY = 0.005  # seconds
+
+_pdf_queue: Optional[asyncio.Queue] = None
+_pdf_batch_worker: Optional[asyncio.Task] = None
+
+# Parsed PDFs kept by content digest, so re-uploaded files are not parsed again
+PDF_CACHE_SIZE = 256
+
+_pdf_cache: "OrderedDict[bytes, Dict[str, Any]]" = OrderedDict()
+
+def _init_pdf_worker() -> None:
+    """Load PyMuPDF when a worker starts, so no document pays the import"""
+    import pymupdf
+
+def _get_pdf_pool() -> ProcessPoolExecutor:
+    """Create the PDF parsing pool on first use"""
+    global _pdf_pool
+    if _pdf_pool is None:
+        # forkserver keeps gRPC and logging threads out of the workers
+        _pdf_pool = ProcessPoolExecutor(
+            max_workers=get_settings().PDF_PARSE_WORKERS or os.cpu_count(),
+            mp_context=multiprocessing.get_context("forkserver"),
+            initializer=_init_pdf_worker
+        )
+    return _pdf_pool
+
+def _discard_pdf_pool(pool: ProcessPoolExecutor) -> None:
+    """Forget a broken pool so the next dispatch starts fresh workers"""
+    global _pdf_pool
+    if _pdf_pool is pool:
+        _pdf_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def _fail_pdf_waiters(waiters: List[asyncio.Future], error: BaseException) -> None:
+    """Fail every caller still waiting on a parse"""
+    for waiter in waiters:
+        if not waiter.done():
+            waiter.set_exception(error)
+
+def shutdown_pdf_pool() -> None:
+    """Stop the PDF parsing workers, if any were started, failing any parses still queued"""
+    global _pdf_pool, _pdf_queue, _pdf_batch_worker
+    if _pdf_batch_worker is not None:
+        _pdf_batch_worker.cancel()
+        _pdf_batch_worker = None
+    if _pdf_queue is not None:
+        queued = []
+        while not _pdf_queue.empty():
+            queued.append(_pdf_queue.get_nowait()[1])
+        _fail_pdf_waiters(queued, RuntimeError("PDF parsing pool was shut down"))
+        _pdf_queue = None
+    if _pdf_pool is not None:
+        _pdf_pool.shutdown(cancel_futures=True)
+        _pdf_pool = None
+
+def _parse_pdf(content: bytes) -> Dict[str, Any]:
+    """Extract text, image references, tables and metadata from a PDF with PyMuPDF"""
+    import pymupdf
+    
+    text_parts = []
+    images = []
+    tables = []
+    with pymupdf.open(stream=content, filetype="pdf") as doc:
+        for page in doc:
+            page_number = page.number + 1
+            text_parts.append(page.get_text("text"))
+            for xref, _, width, height, *_ in page.get_images(full=True):
+                images.append({"page": page_number, "xref": xref, "width": width, "height": height})
+            for table in page.find_tables().tables:
+                tables.append({"page": page_number, "rows": table.extract(), "columns": table.col_count})
+        
+        info = doc.metadata or {}
+        pdf_metadata = {
+            "pages": doc.page_count,
+            "title": info.get("title") or None,
+            "author": info.get("author") or "Unknown",
+            "created": info.get("creationDate") or None
+        }
+    
+    return {
+        "text": "\n".join(text_parts),
+        "pdf_metadata": pdf_metadata,
+        "images": images,
+        "tables": tables
+    }
+
+def _parse_pdf_batch(contents: List[bytes]) -> List[Tuple[Optional[Dict[str, Any]], Optional[str]]]:
+    """Parse several PDFs in one worker call, reporting each document's error separately"""
+    results = []
+    for content in contents:
+        try:
+            results.append((_parse_pdf(content), None))
+        except Exception as e:
+            results.append((None, str(e)))
+    return results
+
+def _resolve_pdf_batch(
+    batch: List[Tuple[bytes, asyncio.Future]],
+    pool: ProcessPoolExecutor,
+    dispatch: asyncio.Future
+) -> None:
+    """Hand each caller in a finished batch its own result or error"""
+    if dispatch.cancelled():
+        _fail_pdf_waiters([waiter for _, waiter in batch], asyncio.CancelledError())
+        return
+    error = dispatch.exception()
+    if error is not None:
+        if isinstance(error, BrokenProcessPool):
+            _discard_pdf_pool(pool)
+        _fail_pdf_waiters([waiter for _, waiter in batch], error)
+        return
+    
+    for (_, waiter), (parsed, parse_error) in zip(batch, dispatch.result()):
+        if waiter.done():
+            continue
+        if parse_error is None:
+            waiter.set_result(parsed)
+        else:
+            waiter.set_exception(ValueError(parse_error))
+
+async def _run_pdf_batches(queue: asyncio.Queue) -> None:
+    """Collect queued PDFs for a few milliseconds and dispatch them to the pool together"""
+    loop = asyncio.get_running_loop()
+    while True:
+        batch = [await queue.get()]
+        try:
+            if queue.qsize() < PDF_BATCH_SIZE - 1:
+                await asyncio.sleep(PDF_BATCH_MAX_DELAY)
+        except asyncio.CancelledError:
+            _fail_pdf_waiters([waiter for _, waiter in batch], RuntimeError("PDF parsing pool was shut down"))
+            raise
+        while len(batch) < PDF_BATCH_SIZE and not queue.empty():
+            batch.append(queue.get_nowait())
+        
+        try:
+            pool = _get_pdf_pool()
+            # Not awaited, so the next batch can start while this one parses
+            dispatch = loop.run_in_executor(pool, _parse_pdf_batch, [content for content, _ in batch])
+        except Exception as e:
+            if isinstance(e, BrokenProcessPool):
+                _discard_pdf_pool(pool)
+            _fail_pdf_waiters([waiter for _, waiter in batch], e)
+            continue
+        dispatch.add_done_callback(partial(_resolve_pdf_batch, batch, pool))
+
+async def _parse_pdf_batched(content: bytes) -> Dict[str, Any]:
+    """Parse a PDF in the worker pool alongside any others submitted at the same time"""
+    global _pdf_queue, _pdf_batch_worker
+    if _pdf_batch_worker is None or _pdf_batch_worker.done():
+        _pdf_queue = asyncio.Queue()
+        _pdf_batch_worker = asyncio.create_task(_run_pdf_batches(_pdf_queue))
+    
+    waiter = asyncio.get_running_loop().create_future()
+    _pdf_queue.put_nowait((content, waiter))
+    return await waiter
+
+# Slice size for validating UTF-8 without decoding a whole upload at once
+UTF8_CHECK_CHUNK_BYTES = 64 * 1024
+
+def _is_valid_utf8(content: bytes) -> bool:
+    """Whether content decodes as UTF-8, checked in bounded chunks"""
+    if content.isascii():
+        return True
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    view = memoryview(content)
+    try:
+        for start in range(0, len(view), UTF8_CHECK_CHUNK_BYTES):
+            decoder.decode(view[start:start + UTF8_CHECK_CHUNK_BYTES])
+        decoder.decode(b"", final=True)
+    except UnicodeDecodeError:
+        return False
+    return True
+
+# WordprocessingML paragraph element
+_DOCX_PARAGRAPH_TAG = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}p"
+
+def _parse_docx(content: bytes) -> str:
+    """Paragraph text of a DOCX, streamed so only one paragraph's XML is held at a time"""
+    from lxml import etree
+    
+    paragraphs = []
+    with zipfile.ZipFile(io.BytesIO(content)) as archive, archive.open("word/document.xml") as document_xml:
+        # Uploaded XML is untrusted: never expand entities or fetch DTDs (XXE)
+        paragraphs_xml = etree.iterparse(
+            document_xml,
+            tag=_DOCX_PARAGRAPH_TAG,
+            resolve_entities=False,
+            no_network=True,
+            load_dtd=False
+        )
+        for _, paragraph in paragraphs_xml:
+            paragraphs.append("".join(paragraph.itertext()))
+            paragraph.clear()
+            # Drop already-read siblings so the tree does not keep growing
+            while paragraph.getprevious() is not None:
+                del paragraph.getparent()[0]
+    return "\n".join(paragraphs)
 
 class DocumentProcessor:
     """Document processor for various file types"""
@@ -32,155 +291,134 @@ class DocumentProcessor:
             # Detect document type
             document_type = self._detect_document_type(filename, content)
             
-            # Process based on type
-            if document_type in self.supported_types:
-                processor = self.supported_types[document_type]
-                result = await processor(content, filename, metadata)
-            else:
-                # Fallback to text processing
-                result = await self._process_text(content, filename, metadata)
+            # Process based on type, falling back to text processing
+            processor = self.supported_types.get(document_type, self._process_text)
+            result = await processor(content, filename, metadata)
             
             # Add metadata
+            processed_at = datetime.now(timezone.utc).isoformat()
             result.update({
                 "document_type": document_type,
                 "filename": filename,
                 "size": len(content),
-                "processed_at": datetime.utcnow().isoformat()
+                "processed_at": processed_at
             })
             
+            # PDFs without an embedded creation date are dated by when they were processed
+            if document_type == "application/pdf" and not result["metadata"]["created"]:
+                result["metadata"]["created"] = processed_at
+            
             return result
             
         except Exception as e:
-            raise ValueError(f"Failed to process document: {str(e)}")
+            raise ValueError(f"Failed to process document: {e}") from e
     
     def _detect_document_type(self, filename: str, content: bytes) -> str:
         """Detect document type from filename and content"""
         try:
             # Try to detect from filename
-            mime_type, _ = mimetypes.guess_type(filename)
+            mime_type = _mime_type_for_extension(filename.rpartition('.')[2].lower())
             if mime_type:
                 return mime_type
             
             # Fallback to content-based detection
-            if content.startswith(b'%PDF'):
-                return "application/pdf"
-            elif content.startswith(b'\xff\xd8\xff'):
-                return "image/jpeg"
-            elif content.startswith(b'\x89PNG'):
-                return "image/png"
-            elif content.startswith(b'II*\x00') or content.startswith(b'MM\x00*'):
-                return "image/tiff"
-            else:
-                return "text/plain"
+            head = content[:16]
+            for magic, magic_type in _MAGIC_NUMBERS:
+                if head.startswith(magic):
+                    return magic_type
+            
+            # Only ambiguous content reaches the model
+            return _identify_with_magika(content) or "text/plain"
                 
         except Exception:
             return "text/plain"
     
     async def _process_pdf(self, content: bytes, filename: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
         """Process PDF documents"""
-        try:
-            # In production, you would use PyPDF2, pdfplumber, or similar
-            # For now, we'll create a mock implementation
-            text_content = f"PDF content from {filename}\n\nThis is a mock PDF processing result."
-            
-            # Extract metadata
-            pdf_metadata = {
-                "pages": 1,  # Mock page count
-                "title": filename,
-                "author": "Unknown",
-                "created": datetime.utcnow().isoformat()
-            }
-            
-            return {
-                "text": text_content,
-                "metadata": {**metadata, **pdf_metadata},
-                "images": [],  # Would extract images in production
-                "tables": []   # Would extract tables in production
-            }
-            
-        except Exception as e:
-            raise ValueError(f"Failed to process PDF: {str(e)}")
+        content_key = hashlib.blake2b(content, digest_size=32).digest()
+        parsed = _pdf_cache.get(content_key)
+        if parsed is None:
+            parsed = await _parse_pdf_batched(content)
+            _pdf_cache[content_key] = parsed
+            if len(_pdf_cache) > PDF_CACHE_SIZE:
+                _pdf_cache.popitem(last=False)
+        else:
+            _pdf_cache.move_to_end(content_key)
+        parsed = copy.deepcopy(parsed)
+        
+        pdf_metadata = parsed["pdf_metadata"]
+        pdf_metadata["title"] = pdf_metadata["title"] or filename
+        
+        return {
+            "text": parsed["text"],
+            "metadata": {**metadata, **pdf_metadata},
+            "images": parsed["images"],
+            "tables": parsed["tables"]
+        }
     
     async def _process_image(self, content: bytes, filename: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
         """Process image documents"""
-        try:
-            # In production, you would use PIL, OpenCV, or similar
-            # For now, we'll create a mock implementation
-            text_content = f"Image content from {filename}\n\nThis is a mock image processing result."
-            
-            # Extract image metadata
-            image_metadata = {
-                "format": filename.split('.')[-1].lower(),
-                "size": len(content),
-                "dimensions": "Unknown"  # Would extract in production
-            }
-            
-            return {
-                "text": text_content,
-                "metadata": {**metadata, **image_metadata},
-                "images": [{"filename": filename, "content": content}],
-                "tables": []
-            }
-            
-        except Exception as e:
-            raise ValueError(f"Failed to process image: {str(e)}")
+        # In production, you would use PIL, OpenCV, or similar
+        # For now, we'll create a mock implementation
+        text_content = f"Image content from {filename}\n\nThis is a mock image processing result."
+        
+        # Extract image metadata
+        image_metadata = {
+            "format": filename.split('.')[-1].lower(),
+            "size": len(content),
+            "dimensions": "Unknown"  # Would extract in production
+        }
+        
+        return {
+            "text": text_content,
+            "metadata": {**metadata, **image_metadata},
+            "images": [{"filename": filename, "content": content}],
+            "tables": []
+        }
     
     async def _process_text(self, content: bytes, filename: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
         """Process text documents"""
-        try:
-            # Decode text content
-            text_content = content.decode('utf-8', errors='ignore')
-            
-            return {
-                "text": text_content,
-                "metadata": metadata,
-                "images": [],
-                "tables": []
-            }
-            
-        except Exception as e:
-            raise ValueError(f"Failed to process text: {str(e)}")
+        # Decode text content
+        text_content = content.decode('utf-8', errors='ignore')
+        
+        return {
+            "text": text_content,
+            "metadata": metadata,
+            "images": [],
+            "tables": []
+        }
     
     async def _process_doc(self, content: bytes, filename: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
         """Process DOC documents"""
-        try:
-            # In production, you would use python-docx or similar
-            # For now, we'll create a mock implementation
-            text_content = f"DOC content from {filename}\n\nThis is a mock DOC processing result."
-            
-            return {
-                "text": text_content,
-                "metadata": {**metadata, "format": "doc"},
-                "images": [],
-                "tables": []
-            }
-            
-        except Exception as e:
-            raise ValueError(f"Failed to process DOC: {str(e)}")
+        # In production, you would use python-docx or similar
+        # For now, we'll create a mock implementation
+        text_content = f"DOC content from {filename}\n\nThis is a mock DOC processing result."
+        
+        return {
+            "text": text_content,
+            "metadata": {**metadata, "format": "doc"},
+            "images": [],
+            "tables": []
+        }
     
     async def _process_docx(self, content: bytes, filename: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
         """Process DOCX documents"""
-        try:
-            # In production, you would use python-docx
-            # For now, we'll create a mock implementation
-            text_content = f"DOCX content from {filename}\n\nThis is a mock DOCX processing result."
-            
-            return {
-                "text": text_content,
-                "metadata": {**metadata, "format": "docx"},
-                "images": [],
-                "tables": []
-            }
-            
-        except Exception as e:
-            raise ValueError(f"Failed to process DOCX: {str(e)}")
+        text_content = await asyncio.to_thread(_parse_docx, content)
+        
+        return {
+            "text": text_content,
+            "metadata": {**metadata, "format": "docx"},
+            "images": [],
+            "tables": []
+        }
     
     async def generate_summary(self, content: str, max_length: int = 500) -> str:
         """Generate a summary of the document content"""
         try:
             # In production, you would use a proper summarization model
             # For now, we'll create a simple extractive summary
-            sentences = content.split('.')
+            # Stop splitting once the first three sentences are separated
+            sentences = content.split('.', 3)
             if len(sentences) <= 3:
                 return content
             
@@ -199,27 +437,14 @@ class DocumentProcessor:
     async def extract_keywords(self, content: str, max_keywords: int = 10) -> List[str]:
         """Extract keywords from document content"""
         try:
-            # Simple keyword extraction (in production, use proper NLP)
-            words = content.lower().split()
+            # Simple keyword extraction (in production, use proper NLP); Counter tallies in C
+            word_count = Counter(
+                word for word in content.lower().split()
+                if len(word) > 3 and word not in _STOP_WORDS
+            )
             
-            # Remove common stop words
-            stop_words = {
-                "the", "a", "an", "and", "or", "but", "in", "on", "at", "to", "for", 
-                "of", "with", "by", "is", "are", "was", "were", "be", "been", "have", 
-                "has", "had", "do", "does", "did", "will", "would", "could", "should"
-            }
-            
-            # Filter and count words
-            filtered_words = [word for word in words if word not in stop_words and len(word) > 3]
-            word_count = {}
-            for word in filtered_words:
-                word_count[word] = word_count.get(word, 0) + 1
-            
-            # Sort by frequency and return top keywords
-            sorted_words = sorted(word_count.items(), key=lambda x: x[1], reverse=True)
-            keywords = [word for word, count in sorted_words[:max_keywords]]
-            
-            return keywords
+            # Top keywords by frequency, ties in order of first appearance
+            return [word for word, _ in word_count.most_common(max_keywords)]
             
         except Exception as e:
             return []
@@ -232,19 +457,12 @@ class DocumentProcessor:
             tables = []
             
             # Simple table detection (look for patterns)
-            lines = content.split('\n')
-            current_table = []
-            
-            for line in lines:
-                if '|' in line or '\t' in line:
-                    current_table.append(line.strip())
-                elif current_table:
-                    if len(current_table) > 1:  # At least 2 rows
-                        tables.append({
-                            "rows": current_table,
-                            "columns": len(current_table[0].split('|')) if '|' in current_table[0] else len(current_table[0].split('\t'))
-                        })
-                    current_table = []
+            for block in _TABLE_BLOCK_RE.finditer(content):
+                rows = [line.strip() for line in block.group().rstrip('\n').split('\n')]
+                tables.append({
+                    "rows": rows,
+                    "columns": rows[0].count('|') + 1 if '|' in rows[0] else rows[0].count('\t') + 1
+                })
             
             return tables
             
@@ -274,16 +492,17 @@ class DocumentProcessor:
     async def get_document_statistics(self, content: str) -> Dict[str, Any]:
         """Get statistics about the document"""
         try:
-            words = content.split()
-            sentences = content.split('.')
-            paragraphs = content.split('\n\n')
+            # Separator counts give the split() piece counts without building the pieces
+            word_count = len(content.split())
+            sentence_count = content.count('.') + 1
+            paragraph_count = content.count('\n\n') + 1
             
             return {
-                "word_count": len(words),
-                "sentence_count": len(sentences),
-                "paragraph_count": len(paragraphs),
+                "word_count": word_count,
+                "sentence_count": sentence_count,
+                "paragraph_count": paragraph_count,
                 "character_count": len(content),
-                "average_words_per_sentence": len(words) / len(sentences) if sentences else 0
+                "average_words_per_sentence": word_count / sentence_count
             }
             
         except Exception as e:
@@ -304,11 +523,8 @@ class DocumentProcessor:
                 issues.append("File is empty")
             
             # Check for binary content in text files
-            if filename.endswith('.txt'):
-                try:
-                    content.decode('utf-8')
-                except UnicodeDecodeError:
-                    warnings.append("File contains binary content")
+            if filename.endswith('.txt') and not _is_valid_utf8(content):
+                warnings.append("File contains binary content")
             
             return {
                 "valid": len(issues) == 0,
@@ -12,7 +12,13 @@ from pathlib import Path
 from app.services.multi_format_report_generator import MultiFormatReportGenerator
 from app.services.vertex_ai_service import VertexAIService
 from app.services.agent_evaluation_service import AgentEvaluationService
+from app.services.conversation_index import get_conversation_index
 
+# Phrases that name what a requested report should cover
+_CONTEXT_PATTERNS = [
+    re.compile(r'(about|on|regarding|for)\s+([^.,!?]+)', re.IGNORECASE),
+    re.compile(r'(inspection|assessment|analysis|review)\s+(of|for|about)\s+([^.,!?]+)', re.IGNORECASE),
+]
 
 class EnhancedChatIntegrationService:
     """Enhanced chat service with automatic report generation capabilities"""
@@ -23,6 +29,7 @@ class EnhancedChatIntegrationService:
         self.evaluation_service = AgentEvaluationService()
         self.conversations_dir = Path("conversations")
         self.conversations_dir.mkdir(exist_ok=True)
+        self.conversation_index = get_conversation_index(self.conversations_dir)
         
         # Report request patterns
         self.report_triggers = [
@@ -37,7 +44,10 @@ class EnhancedChatIntegrationService:
             r'\b(inspection|assessment)\s+(report|findings|results)\b',
         ]
         
-        self.compiled_triggers = [re.compile(pattern, re.IGNORECASE) for pattern in self.report_triggers]
+        # One alternation, so a message is scanned once rather than once per trigger
+        self.report_trigger_pattern = re.compile(
+            "|".join(f"(?:{pattern})" for pattern in self.report_triggers), re.IGNORECASE
+        )
     
     async def process_chat_message(
         self,
@@ -169,13 +179,12 @@ class EnhancedChatIntegrationService:
             Tuple of (is_request, context)
         """
         
-        # Check against compiled patterns
-        for pattern in self.compiled_triggers:
-            match = pattern.search(message)
-            if match:
-                # Extract context (what the report should be about)
-                context = self._extract_report_context(message, match)
-                return True, context
+        # Check against the combined trigger pattern
+        match = self.report_trigger_pattern.search(message)
+        if match:
+            # Extract context (what the report should be about)
+            context = self._extract_report_context(message, match)
+            return True, context
         
         return False, None
     
@@ -186,13 +195,8 @@ class EnhancedChatIntegrationService:
         context_words = []
         
         # Look for key phrases
-        context_patterns = [
-            r'(about|on|regarding|for)\s+([^.,!?]+)',
-            r'(inspection|assessment|analysis|review)\s+(of|for|about)\s+([^.,!?]+)',
-        ]
-        
-        for pattern in context_patterns:
-            ctx_match = re.search(pattern, message, re.IGNORECASE)
+        for pattern in _CONTEXT_PATTERNS:
+            ctx_match = pattern.search(message)
             if ctx_match:
                 context_words.append(ctx_match.group(0))
         
@@ -465,20 +469,26 @@ class EnhancedChatIntegrationService:
             "message_count": len(messages)
         }
         
-        conversation_file = self.conversations_dir / f"{conversation_id}.json"
+        conversation_file = (
+            await self.conversation_index.locate(conversation_id)
+            or self.conversation_index.shard_path(conversation_id, datetime.now())
+        )
         with open(conversation_file, 'w', encoding='utf-8') as f:
             json.dump(conversation_data, f, indent=2)
+        await self.conversation_index.upsert(conversation_file, conversation_data)
     
     async def get_conversation(self, conversation_id: str) -> Optional[Dict[str, Any]]:
         """Load conversation from disk"""
         
-        conversation_file = self.conversations_dir / f"{conversation_id}.json"
-        
-        if not conversation_file.exists():
+        conversation_file = await self.conversation_index.locate(conversation_id)
+        if conversation_file is None:
             return None
         
-        with open(conversation_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        try:
+            with open(conversation_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
     
     async def _trigger_conversation_evaluation(
         self,
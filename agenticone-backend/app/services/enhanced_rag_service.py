@@ -8,7 +8,6 @@ from datetime import datetime
 import hashlib
 import json
 
-from app.config import settings
 from app.services.vector_store import VectorStore
 from app.services.document_processor import DocumentProcessor
 from app.models.database import db_client
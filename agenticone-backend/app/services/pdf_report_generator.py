@@ -3,8 +3,10 @@ PDF Report Generator for AgenticOne Specialists
 Generates professional PDF reports without dependency on Vertex AI
 """
 
+import asyncio
 import os
 import json
+import logging
 from datetime import datetime
 from typing import Dict, List, Any, Optional
 from pathlib import Path
@@ -20,7 +22,8 @@ from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_JUSTIFY
 from reportlab.pdfgen import canvas
 from reportlab.lib.utils import ImageReader
 
-from app.config import settings
+
+logger = logging.getLogger(__name__)
 
 
 class PDFReportGenerator:
@@ -40,9 +43,7 @@ class PDFReportGenerator:
     ) -> Dict[str, Any]:
         """Generate a comprehensive PDF report for any specialist type"""
         
-        print(f"📄 Generating PDF report for {specialist_type}")
-        print(f"   - Customer Request: {customer_request}")
-        print(f"   - Analysis Data: {analysis_data}")
+        logger.debug("Generating PDF report for %s", specialist_type)
         
         # Create enhanced analysis content
         enhanced_analysis = await self._create_enhanced_analysis(
@@ -323,8 +324,8 @@ class PDFReportGenerator:
         story.append(Spacer(1, 30))
         story.append(Paragraph("Generated by AgenticOne AI Platform", body_style))
         
-        # Build PDF
-        doc.build(story)
+        # Build PDF off the event loop; layout and rendering are CPU-bound
+        await asyncio.to_thread(doc.build, story)
         
         print(f"✅ PDF report generated: {pdf_path}")
         return str(pdf_path)
@@ -1,17 +1,20 @@
 """
 RAG (Retrieval-Augmented Generation) Service for document processing and search
 """
-import uuid
 import asyncio
-from typing import Dict, List, Any, Optional
-from datetime import datetime
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Tuple
+from datetime import datetime, timezone
+from ulid import ULID
 
-from app.config import settings
 from app.services.vector_store import VectorStore
 from app.services.document_processor import DocumentProcessor
 from app.services.vertex_ai_service import VertexAIService
 from app.models.database import db_client
 
+# Chat responses remembered per (agent, user or session, normalised query)
+RESPONSE_CACHE_SIZE = 10_000
+
 class RAGService:
     """RAG service for document processing and retrieval"""
     
@@ -19,6 +22,7 @@ class RAGService:
         self.vector_store = VectorStore()
         self.document_processor = DocumentProcessor()
         self.vertex_ai_service = VertexAIService()
+        self.response_cache: "OrderedDict[Tuple[str, str, str], Any]" = OrderedDict()
         self.status = "initialized"
     
     async def process_document(
@@ -30,7 +34,7 @@ class RAGService:
         """Process and store a document"""
         try:
             # Generate document ID
-            document_id = str(uuid.uuid4())
+            document_id = str(ULID())
             
             # Process document content
             processed_content = await self.document_processor.process_document(
@@ -50,7 +54,7 @@ class RAGService:
                     "filename": filename,
                     "document_type": processed_content.get("document_type", "unknown"),
                     "size": len(content),
-                    "processed_at": datetime.utcnow().isoformat(),
+                    "processed_at": datetime.now(timezone.utc).isoformat(),
                     **metadata
                 }
             )
@@ -237,21 +241,51 @@ class RAGService:
         self, 
         documents: List[Dict[str, Any]]
     ) -> List[str]:
-        """Process multiple documents in batch"""
+        """Process multiple documents with one embedding batch and one metadata write batch"""
         try:
-            document_ids = []
-            
-            # Process documents in parallel
-            tasks = []
-            for doc in documents:
-                task = self.process_document(
-                    doc["content"],
-                    doc["filename"],
-                    doc.get("metadata", {})
+            # Parse documents in parallel
+            processed = await asyncio.gather(*(
+                self.document_processor.process_document(
+                    doc["content"], doc["filename"], doc.get("metadata", {})
                 )
-                tasks.append(task)
+                for doc in documents
+            ))
             
-            document_ids = await asyncio.gather(*tasks)
+            texts = [result.get("text", "") for result in processed]
+            embeddings = await self.vector_store.create_embeddings_batch(texts)
+            
+            document_ids = []
+            records = []
+            processed_at = datetime.now(timezone.utc).isoformat()
+            for doc, result, text_content, doc_embeddings in zip(documents, processed, texts, embeddings):
+                document_id = str(ULID())
+                metadata = doc.get("metadata", {})
+                document_type = result.get("document_type", "unknown")
+                
+                await self.vector_store.store_document(
+                    document_id=document_id,
+                    content=text_content,
+                    embeddings=doc_embeddings,
+                    metadata={
+                        "filename": doc["filename"],
+                        "document_type": document_type,
+                        "size": len(doc["content"]),
+                        "processed_at": processed_at,
+                        **metadata
+                    }
+                )
+                
+                records.append({
+                    "document_id": document_id,
+                    "filename": doc["filename"],
+                    "document_type": document_type,
+                    "size": len(doc["content"]),
+                    "storage_path": f"documents/{document_id}",
+                    "metadata": metadata
+                })
+                document_ids.append(document_id)
+            
+            await db_client.create_documents_bulk(records)
             return document_ids
             
         except Exception as e:
@@ -275,6 +309,25 @@ class RAGService:
         except Exception as e:
             raise ValueError(f"Failed to get document statistics: {str(e)}")
     
+    @staticmethod
+    def _response_cache_key(namespace: str, scope: str, query: str) -> Tuple[str, str, str]:
+        """Cache key for a query, ignoring case and whitespace differences"""
+        return namespace, scope, " ".join(query.lower().split())
+    
+    def get_cached_response(self, namespace: str, scope: str, query: str) -> Optional[Any]:
+        """Return the response this user or session already got for the same query, if any"""
+        key = self._response_cache_key(namespace, scope, query)
+        response = self.response_cache.get(key)
+        if response is not None:
+            self.response_cache.move_to_end(key)
+        return response
+    
+    def cache_response(self, namespace: str, scope: str, query: str, response: Any):
+        """Remember a response so the same user or session repeating the query can reuse it"""
+        self.response_cache[self._response_cache_key(namespace, scope, query)] = response
+        if len(self.response_cache) > RESPONSE_CACHE_SIZE:
+            self.response_cache.popitem(last=False)
+    
     async def close(self):
         """Close the RAG service and cleanup resources"""
         try:
@@ -5,14 +5,17 @@ Generates comprehensive analysis reports with HTML output
 
 import os
 import json
+import hashlib
+import shutil
+import tempfile
 from datetime import datetime
 from typing import Dict, List, Any, Optional
 from pathlib import Path
 import markdown
 from jinja2 import Template
 
-from app.config import settings
 from app.services.vertex_ai_service import VertexAIService
+from app.utils.helpers import extract_json_object
 
 
 class ReportGenerator:
@@ -24,6 +27,9 @@ class ReportGenerator:
         self.reports_dir = Path("reports")
         self.templates_dir.mkdir(exist_ok=True)
         self.reports_dir.mkdir(exist_ok=True)
+        # Rendered Markdown lives apart from the report listing
+        self.cache_dir = self.reports_dir / "cache"
+        self.cache_dir.mkdir(exist_ok=True)
         
         # Template mapping for different specialist types
         self.template_mapping = {
@@ -103,24 +109,18 @@ class ReportGenerator:
             print(f"🤖 AI Response for {specialist_type}: {ai_response[:200]}...")
             
             # Try to parse JSON response from AI
-            try:
-                # Look for JSON in the response
-                import re
-                json_match = re.search(r'\{.*\}', ai_response, re.DOTALL)
-                if json_match:
-                    ai_data = json.loads(json_match.group())
-                    return {
-                        "summary": ai_data.get("summary", f"AI-enhanced analysis for {specialist_type}"),
-                        "findings": ai_data.get("findings", analysis_data.get("findings", [])),
-                        "risk_level": ai_data.get("risk_level", "Medium"),
-                        "risk_reasoning": ai_data.get("risk_reasoning", "Based on AI analysis"),
-                        "recommendations": ai_data.get("recommendations", analysis_data.get("recommendations", [])),
-                        "technical_details": ai_data.get("technical_details", analysis_data.get("technical_details", "")),
-                        "next_steps": ai_data.get("next_steps", ["Review findings", "Implement recommendations"]),
-                        "ai_insights": ai_response
-                    }
-            except json.JSONDecodeError:
-                pass
+            ai_data = extract_json_object(ai_response)
+            if ai_data is not None:
+                return {
+                    "summary": ai_data.get("summary", f"AI-enhanced analysis for {specialist_type}"),
+                    "findings": ai_data.get("findings", analysis_data.get("findings", [])),
+                    "risk_level": ai_data.get("risk_level", "Medium"),
+                    "risk_reasoning": ai_data.get("risk_reasoning", "Based on AI analysis"),
+                    "recommendations": ai_data.get("recommendations", analysis_data.get("recommendations", [])),
+                    "technical_details": ai_data.get("technical_details", analysis_data.get("technical_details", "")),
+                    "next_steps": ai_data.get("next_steps", ["Review findings", "Implement recommendations"]),
+                    "ai_insights": ai_response
+                }
             
             # If JSON parsing fails, use the raw AI response
             return {
@@ -284,9 +284,23 @@ class ReportGenerator:
     async def convert_markdown_to_html(self, markdown_content: str, output_path: str = None) -> str:
         """Convert Markdown content to HTML (print-ready for PDF conversion)"""
         
+        # Identical Markdown always renders to the same file, so reuse it when present
+        content_key = hashlib.blake2b(markdown_content.encode('utf-8'), digest_size=16).hexdigest()
+        cached_path = self.cache_dir / f"markdown_{content_key}.html"
+        
+        if not cached_path.exists():
+            self._render_markdown_file(markdown_content, cached_path)
+        
         if not output_path:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            output_path = f"report_{timestamp}.html"
+            return str(cached_path)
+        
+        # A copy, not a hard link, so edits to the output never touch the cache
+        shutil.copyfile(cached_path, output_path)
+        
+        return output_path
+    
+    def _render_markdown_file(self, markdown_content: str, output_path: Path) -> None:
+        """Render Markdown to a styled HTML file"""
         
         # Convert Markdown to HTML
         html_content = markdown.markdown(
@@ -359,24 +373,27 @@ class ReportGenerator:
         </html>
         """
         
-        # Save as HTML (print-ready)
-        with open(output_path, 'w', encoding='utf-8') as f:
+        # Save as HTML (print-ready); write-then-rename so readers never see a partial file
+        with tempfile.NamedTemporaryFile(
+            'w', encoding='utf-8', dir=output_path.parent, suffix='.tmp', delete=False
+        ) as f:
             f.write(styled_html)
-        
-        return output_path
+        os.replace(f.name, output_path)
     
     def get_available_reports(self) -> List[Dict[str, Any]]:
         """Get list of available reports"""
         reports = []
         
-        for report_file in self.reports_dir.glob("*"):
-            if report_file.is_file():
-                reports.append({
-                    "filename": report_file.name,
-                    "path": str(report_file),
-                    "size": report_file.stat().st_size,
-                    "created": datetime.fromtimestamp(report_file.stat().st_ctime).isoformat(),
-                    "type": "HTML"
-                })
+        with os.scandir(self.reports_dir) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    stat = entry.stat()
+                    reports.append({
+                        "filename": entry.name,
+                        "path": str(self.reports_dir / entry.name),
+                        "size": stat.st_size,
+                        "created": datetime.fromtimestamp(stat.st_ctime).isoformat(),
+                        "type": "HTML"
+                    })
         
         return sorted(reports, key=lambda x: x['created'], reverse=True)
@@ -2,38 +2,82 @@
 Vector Store Service for document embeddings and similarity search using Vertex AI
 """
 import numpy as np
+from collections import OrderedDict
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 
-from app.config import settings
+from app.config import get_settings
 from app.services.vertex_ai_service import VertexAIService
 
+# Exact-text embedding cache size
+EMBEDDING_CACHE_SIZE = 10_000
+
 class VectorStore:
     """Vector store for document embeddings and similarity search using Vertex AI"""
     
     def __init__(self):
         self.vertex_ai_service = VertexAIService()
         self.documents = {}  # In production, this would be a proper vector database
+        self._embedding_cache: "OrderedDict[str, List[float]]" = OrderedDict()
         self.status = "initialized"
     
     async def create_embeddings(self, text: str) -> List[float]:
         """Create embeddings for text content using Vertex AI"""
+        cached = self._embedding_cache.get(text)
+        if cached is not None:
+            self._embedding_cache.move_to_end(text)
+            return list(cached)
+        
         try:
             # Use Vertex AI for real embeddings
             embedding = await self.vertex_ai_service.create_embeddings(text)
             
             # Ensure correct dimensions
-            target_dim = settings.VECTOR_SEARCH_DIMENSIONS
+            target_dim = get_settings().VECTOR_SEARCH_DIMENSIONS
             if len(embedding) < target_dim:
                 embedding.extend([0.0] * (target_dim - len(embedding)))
             else:
                 embedding = embedding[:target_dim]
             
-            return embedding
+            self._remember_embedding(text, embedding)
+            return list(embedding)
             
         except Exception as e:
             raise ValueError(f"Failed to create embeddings: {str(e)}")
     
+    async def create_embeddings_batch(self, texts: List[str]) -> List[List[float]]:
+        """Create embeddings for several texts, sending only uncached ones in one batch"""
+        try:
+            resolved = {}
+            missing = []
+            for text in dict.fromkeys(texts):
+                cached = self._embedding_cache.get(text)
+                if cached is None:
+                    missing.append(text)
+                else:
+                    resolved[text] = cached
+            
+            if missing:
+                target_dim = get_settings().VECTOR_SEARCH_DIMENSIONS
+                new_embeddings = await self.vertex_ai_service.create_embeddings_batch(missing)
+                for text, embedding in zip(missing, new_embeddings):
+                    embedding = list(embedding)[:target_dim]
+                    embedding.extend([0.0] * (target_dim - len(embedding)))
+                    self._remember_embedding(text, embedding)
+                    resolved[text] = embedding
+            
+            return [list(resolved[text]) for text in texts]
+            
+        except Exception as e:
+            raise ValueError(f"Failed to create embeddings: {str(e)}")
+    
+    def _remember_embedding(self, text: str, embedding: List[float]):
+        """Add an embedding to the bounded exact-text cache"""
+        self._embedding_cache[text] = embedding
+        self._embedding_cache.move_to_end(text)
+        if len(self._embedding_cache) > EMBEDDING_CACHE_SIZE:
+            self._embedding_cache.popitem(last=False)
+    
     async def store_document(
         self, 
         document_id: str, 
@@ -1,9 +1,16 @@
 """
 Vertex AI Service for real Google Cloud AI integration
 """
+import asyncio
 import base64
+import hashlib
+import heapq
+import itertools
 import json
-from typing import Dict, List, Any, Optional
+import logging
+from collections import OrderedDict
+from pathlib import Path
+from typing import AsyncIterator, Callable, Dict, List, Any, Optional
 from datetime import datetime
 
 from google.cloud import aiplatform
@@ -11,12 +18,28 @@ from google.cloud.aiplatform import gapic as aip
 from vertexai.preview.generative_models import GenerativeModel, Part
 import vertexai
 
-from app.config import settings
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Maximum texts per Vertex AI embedding request
+EMBEDDING_BATCH_SIZE = 5
+
+# Exact-prompt response memo: in-memory LRU in front of an on-disk store
+LLM_CACHE_SIZE = 1024
+LLM_CACHE_DIR = Path("conversations") / "_llm_cache"
+# The on-disk store keeps at most this many responses, dropping the oldest
+LLM_CACHE_DISK_ENTRIES = 8192
+# Writes between prunes of the on-disk store
+LLM_CACHE_PRUNE_INTERVAL = 256
+_llm_cache: "OrderedDict[str, str]" = OrderedDict()
+_llm_cache_writes = itertools.count(1)
 
 class VertexAIService:
     """Real Vertex AI service for document processing and AI analysis"""
     
     def __init__(self):
+        settings = get_settings()
         self.project_id = settings.GOOGLE_CLOUD_PROJECT
         self.location = settings.VERTEX_AI_LOCATION
         self.model_name = settings.VERTEX_AI_MODEL
@@ -44,24 +67,176 @@ class VertexAIService:
     ) -> str:
         """Generate text using Vertex AI Gemini"""
         try:
-            # Combine system prompt and user prompt
-            full_prompt = f"{system_prompt}\n\n{prompt}" if system_prompt else prompt
-            
-            # Generate response
-            response = self.model.generate_content(
-                full_prompt,
-                generation_config={
-                    "max_output_tokens": max_tokens,
-                    "temperature": temperature,
-                }
-            )
-            
-            return response.text
-            
+            return self._generate_content(prompt, system_prompt, max_tokens, temperature)
         except Exception as e:
             print(f"Vertex AI generation error: {e}")
             return await self._generate_fallback_response(prompt, system_prompt)
     
+    async def generate_text_cached(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        max_tokens: int = 1000,
+        temperature: float = 0.7,
+        stop_when: Optional[Callable[[str], bool]] = None
+    ) -> str:
+        """Generate text, returning the stored response when this exact request was answered before
+
+        With ``stop_when``, the response is streamed and generation stops as soon
+        as the text so far satisfies it, rather than running to ``max_tokens``.
+        It is re-checked only when a chunk brings a closing ``}``, which is when a
+        JSON object can have completed.
+        """
+        key = hashlib.sha256(
+            json.dumps([self.model_name, system_prompt, prompt, max_tokens, temperature]).encode()
+        ).hexdigest()
+        
+        cached = _llm_cache.get(key)
+        if cached is None:
+            cached = await asyncio.to_thread(self._read_cached_response, key)
+        if cached is not None:
+            self._remember_response(key, cached)
+            return cached
+        
+        try:
+            if stop_when is None:
+                text = self._generate_content(prompt, system_prompt, max_tokens, temperature)
+            else:
+                text = await self._generate_until(prompt, system_prompt, max_tokens, temperature, stop_when)
+        except Exception as e:
+            logger.error("Vertex AI generation error: %s", e)
+            return await self._generate_fallback_response(prompt, system_prompt)
+        
+        # Only real model output is memoised; fallbacks are retried next time
+        self._remember_response(key, text)
+        await asyncio.to_thread(self._write_cached_response, key, text)
+        return text
+    
+    async def generate_text_stream(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        max_tokens: int = 1000,
+        temperature: float = 0.7
+    ) -> AsyncIterator[str]:
+        """Yield text from Vertex AI Gemini as it is generated; closing the iterator ends the stream"""
+        full_prompt = f"{system_prompt}\n\n{prompt}" if system_prompt else prompt
+        
+        responses = await self.model.generate_content_async(
+            full_prompt,
+            generation_config={
+                "max_output_tokens": max_tokens,
+                "temperature": temperature,
+            },
+            stream=True
+        )
+        try:
+            async for response in responses:
+                yield response.text
+        finally:
+            # Abandoning the stream early must also end the underlying RPC
+            close = getattr(responses, "aclose", None)
+            if close is not None:
+                await close()
+    
+    async def _generate_until(
+        self,
+        prompt: str,
+        system_prompt: Optional[str],
+        max_tokens: int,
+        temperature: float,
+        stop_when: Callable[[str], bool]
+    ) -> str:
+        """Stream a response, abandoning the rest of it once ``stop_when`` accepts the text"""
+        chunks = []
+        stream = self.generate_text_stream(prompt, system_prompt, max_tokens, temperature)
+        try:
+            async for chunk in stream:
+                chunks.append(chunk)
+                # Joining and re-checking on every chunk would be quadratic in the response length
+                if "}" in chunk:
+                    text = "".join(chunks)
+                    if stop_when(text):
+                        return text
+        finally:
+            await stream.aclose()
+        return "".join(chunks)
+    
+    def _generate_content(
+        self,
+        prompt: str,
+        system_prompt: Optional[str],
+        max_tokens: int,
+        temperature: float
+    ) -> str:
+        """Call the Gemini model, raising on failure"""
+        # Combine system prompt and user prompt
+        full_prompt = f"{system_prompt}\n\n{prompt}" if system_prompt else prompt
+        
+        response = self.model.generate_content(
+            full_prompt,
+            generation_config={
+                "max_output_tokens": max_tokens,
+                "temperature": temperature,
+            }
+        )
+        
+        return response.text
+    
+    @staticmethod
+    def _remember_response(key: str, text: str):
+        """Store a response in the in-memory LRU"""
+        _llm_cache[key] = text
+        _llm_cache.move_to_end(key)
+        if len(_llm_cache) > LLM_CACHE_SIZE:
+            _llm_cache.popitem(last=False)
+    
+    @staticmethod
+    def _cached_response_path(key: str) -> Path:
+        """Shard cached responses by the first two hex digits of their key"""
+        return LLM_CACHE_DIR / key[:2] / f"{key}.txt"
+    
+    @classmethod
+    def _read_cached_response(cls, key: str) -> Optional[str]:
+        """Load a persisted response, if any"""
+        try:
+            return cls._cached_response_path(key).read_text(encoding="utf-8")
+        except OSError:
+            return None
+    
+    @classmethod
+    def _write_cached_response(cls, key: str, text: str):
+        """Persist a response atomically so restarts keep it"""
+        path = cls._cached_response_path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(".tmp")
+            tmp_path.write_text(text, encoding="utf-8")
+            tmp_path.replace(path)
+        except OSError as e:
+            logger.warning("⚠️ Could not persist LLM response cache entry: %s", e)
+            return
+        
+        if next(_llm_cache_writes) % LLM_CACHE_PRUNE_INTERVAL == 0:
+            cls._prune_cached_responses()
+    
+    @staticmethod
+    def _prune_cached_responses():
+        """Delete the oldest persisted responses beyond ``LLM_CACHE_DISK_ENTRIES``"""
+        entries = []
+        for path in LLM_CACHE_DIR.glob("*/*.txt"):
+            try:
+                entries.append((path.stat().st_mtime, path))
+            except OSError:
+                continue
+        
+        excess = len(entries) - LLM_CACHE_DISK_ENTRIES
+        if excess <= 0:
+            return
+        for _, path in heapq.nsmallest(excess, entries):
+            path.unlink(missing_ok=True)
+        logger.info("🧹 Pruned %d LLM response cache entries", excess)
+    
     async def _generate_fallback_response(self, prompt: str, system_prompt: Optional[str] = None) -> str:
         """Generate intelligent fallback response based on prompt content"""
         try:
@@ -192,7 +367,7 @@ class VertexAIService:
             embedding = [float(int(text_hash[i:i+2], 16)) / 255.0 for i in range(0, len(text_hash), 2)]
             
             # Pad or truncate to required dimensions
-            target_dim = settings.VECTOR_SEARCH_DIMENSIONS
+            target_dim = get_settings().VECTOR_SEARCH_DIMENSIONS
             if len(embedding) < target_dim:
                 embedding.extend([0.0] * (target_dim - len(embedding)))
             else:
@@ -200,6 +375,24 @@ class VertexAIService:
             
             return embedding
     
+    async def create_embeddings_batch(self, texts: List[str]) -> List[List[float]]:
+        """Create embeddings for several texts with as few model requests as possible"""
+        try:
+            from vertexai.language_models import TextEmbeddingModel
+            
+            embedding_model = TextEmbeddingModel.from_pretrained("textembedding-gecko@001")
+            
+            embeddings = []
+            for start in range(0, len(texts), EMBEDDING_BATCH_SIZE):
+                batch = embedding_model.get_embeddings(texts[start:start + EMBEDDING_BATCH_SIZE])
+                embeddings.extend(embedding.values for embedding in batch)
+            
+            return embeddings
+            
+        except Exception:
+            # Same per-text fallback as create_embeddings
+            return [await self.create_embeddings(text) for text in texts]
+    
     def _create_analysis_prompt(self, analysis_type: str, document_text: str, context: Optional[str] = None) -> str:
         """Create analysis prompt based on type"""
         base_prompt = f"Analyze the following document for {analysis_type}:\n\n"
@@ -5,7 +5,7 @@ import base64
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 
-from app.config import settings
+from app.config import get_settings
 from app.services.vertex_ai_service import VertexAIService
 
 class VisionService:
@@ -13,6 +13,7 @@ class VisionService:
     
     def __init__(self):
         self.vertex_ai_service = VertexAIService()
+        settings = get_settings()
         self.model_name = settings.VERTEX_AI_MODEL
         self.location = settings.VERTEX_AI_LOCATION
         self.status = "initialized"
@@ -0,0 +1,101 @@
+"""
+Dynamic request batching for list-in/list-out async handlers
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+
+
+class AsyncBatcher:
+    """Coalesce concurrent calls into batches for a single batch handler
+
+    Callers await ``process(item)``; a background task collects up to
+    ``max_batch_size`` items (waiting at most ``batch_wait_timeout_s`` after
+    the first one) and hands them to ``process_batch``, which must return
+    one result per item in the same order.
+    """
+
+    def __init__(
+        self,
+        process_batch: Callable[[List[Any]], Awaitable[List[Any]]],
+        max_batch_size: int = 8,
+        batch_wait_timeout_s: float = 0.05
+    ):
+        self._process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.batch_wait_timeout_s = batch_wait_timeout_s
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def process(self, item: Any) -> Any:
+        """Submit one item and wait for its individual result"""
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._loop is not loop:
+            # Created lazily so the queue and task belong to the running loop
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+
+        future = loop.create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    async def _collect_batch(self, batch: List[Tuple[Any, asyncio.Future]]):
+        """Wait for one item, then gather more into ``batch`` until full or the window closes"""
+        loop = asyncio.get_running_loop()
+        batch.append(await self._queue.get())
+        deadline = loop.time() + self.batch_wait_timeout_s
+
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+    @staticmethod
+    def _fail(batch: List[Tuple[Any, asyncio.Future]], error: BaseException):
+        """Fail every caller in a batch that is still waiting"""
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(error)
+
+    async def _run(self):
+        """Background loop dispatching batches and resolving caller futures"""
+        while True:
+            batch: List[Tuple[Any, asyncio.Future]] = []
+            try:
+                await self._collect_batch(batch)
+                results = await self._process_batch([item for item, _ in batch])
+            except asyncio.CancelledError:
+                self._fail(batch, RuntimeError("Batcher was closed"))
+                raise
+            except Exception as e:
+                self._fail(batch, e)
+                continue
+
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+            if len(results) < len(batch):
+                self._fail(batch, RuntimeError(
+                    f"Batch handler returned {len(results)} results for {len(batch)} items"
+                ))
+
+    async def close(self):
+        """Stop the background task, failing any calls still waiting"""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+        if self._queue is not None:
+            queued = []
+            while not self._queue.empty():
+                queued.append(self._queue.get_nowait())
+            self._fail(queued, RuntimeError("Batcher was closed"))
@@ -3,10 +3,65 @@ Helper functions and utilities
 """
 import uuid
 import hashlib
+import logging
+import queue
+import re
+from logging.handlers import QueueHandler, QueueListener
 from typing import Dict, List, Any, Optional
 from datetime import datetime, timedelta
 import json
 
+_log_listener: Optional[QueueListener] = None
+
+# Patterns used on every call, compiled once
+_WORD_RE = re.compile(r'\b[a-zA-Z]{3,}\b')
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+_UNSAFE_FILENAME_CHARS_RE = re.compile(r'[^\w\-_\.]')
+_JSON_DECODER = json.JSONDecoder()
+
+_STOP_WORDS = frozenset({
+    'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with',
+    'by', 'is', 'are', 'was', 'were', 'be', 'been', 'have', 'has', 'had',
+    'do', 'does', 'did', 'will', 'would', 'could', 'should', 'may', 'might'
+})
+
+class JsonLogFormatter(logging.Formatter):
+    """Format log records as one JSON object per line"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "pid": record.process,
+            "message": record.getMessage()
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+def setup_logging(level: str = "INFO", log_format: str = "text") -> None:
+    """Route root logging through a queue so formatting and I/O happen off the request path"""
+    global _log_listener
+    if _log_listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler()
+    if log_format == "json":
+        stream_handler.setFormatter(JsonLogFormatter())
+    else:
+        stream_handler.setFormatter(
+            logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
+        )
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.handlers = [QueueHandler(log_queue)]
+    root.setLevel(level)
+
+    _log_listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _log_listener.start()
+
 def generate_id() -> str:
     """Generate a unique ID"""
     return str(uuid.uuid4())
@@ -27,9 +82,7 @@ def parse_timestamp(timestamp_str: str) -> datetime:
 
 def validate_email(email: str) -> bool:
     """Validate email format"""
-    import re
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return re.match(pattern, email) is not None
+    return _EMAIL_RE.match(email) is not None
 
 def validate_document_type(filename: str) -> str:
     """Validate and determine document type"""
@@ -56,9 +109,8 @@ def validate_document_type(filename: str) -> str:
 
 def sanitize_filename(filename: str) -> str:
     """Sanitize filename for safe storage"""
-    import re
     # Remove or replace unsafe characters
-    sanitized = re.sub(r'[^\w\-_\.]', '_', filename)
+    sanitized = _UNSAFE_FILENAME_CHARS_RE.sub('_', filename)
     # Limit length
     if len(sanitized) > 255:
         name, ext = sanitized.rsplit('.', 1) if '.' in sanitized else (sanitized, '')
@@ -79,19 +131,8 @@ def calculate_confidence(factors: List[float]) -> float:
 
 def extract_keywords(text: str, max_keywords: int = 10) -> List[str]:
     """Extract keywords from text"""
-    import re
-    
-    # Simple keyword extraction
-    words = re.findall(r'\b[a-zA-Z]{3,}\b', text.lower())
-    
-    # Remove common stop words
-    stop_words = {
-        'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with',
-        'by', 'is', 'are', 'was', 'were', 'be', 'been', 'have', 'has', 'had',
-        'do', 'does', 'did', 'will', 'would', 'could', 'should', 'may', 'might'
-    }
-    
-    filtered_words = [word for word in words if word not in stop_words]
+    # Simple keyword extraction, dropping common stop words
+    filtered_words = [word for word in _WORD_RE.findall(text.lower()) if word not in _STOP_WORDS]
     
     # Count frequency
     word_count = {}
@@ -168,6 +209,17 @@ def parse_json_safe(json_str: str, default: Any = None) -> Any:
     except (json.JSONDecodeError, TypeError):
         return default
 
+def extract_json_object(text: str) -> Optional[Dict[str, Any]]:
+    """Decode the first JSON object in text, ignoring any prose before or after it"""
+    start = text.find('{')
+    if start < 0:
+        return None
+    try:
+        parsed, _ = _JSON_DECODER.raw_decode(text, start)
+    except json.JSONDecodeError:
+        return None
+    return parsed
+
 def format_duration(seconds: float) -> str:
     """Format duration in human readable format"""
     if seconds < 60:
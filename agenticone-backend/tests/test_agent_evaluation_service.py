@@ -0,0 +1,17 @@
+"""
+Tests for agent evaluation scoring
+"""
+from app.services.agent_evaluation_service import AgentEvaluationService
+
+
+def _technical_score(agent_role: str, content: str) -> float:
+    keywords, scorer = AgentEvaluationService._role_scorer(agent_role)
+    return scorer(AgentEvaluationService._match_keywords(content.lower(), keywords))
+
+
+def test_words_containing_rov_do_not_score_for_subsea():
+    assert _technical_score("subsea_engineer", "We provide, improve and approve the approach.") == 0.0
+
+
+def test_role_keywords_score_their_share():
+    assert _technical_score("subsea_engineer", "Inspect the subsea pipeline.") == 2 / 6
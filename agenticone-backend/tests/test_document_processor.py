@@ -0,0 +1,33 @@
+"""
+Tests for document processing
+"""
+import io
+import zipfile
+
+from app.services.document_processor import _parse_docx
+
+_HOSTILE_DOCUMENT_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<!DOCTYPE w:document [<!ENTITY xxe SYSTEM "file://{secret_path}">]>
+<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">
+  <w:body>
+    <w:p><w:r><w:t>before &xxe; after</w:t></w:r></w:p>
+  </w:body>
+</w:document>
+"""
+
+
+def _docx_with_document_xml(document_xml: str) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("word/document.xml", document_xml)
+    return buffer.getvalue()
+
+
+def test_parse_docx_does_not_expand_external_entities(tmp_path):
+    secret = tmp_path / "secret.txt"
+    secret.write_text("TOP-SECRET-HOSTNAME")
+
+    text = _parse_docx(_docx_with_document_xml(_HOSTILE_DOCUMENT_XML.format(secret_path=secret)))
+
+    assert "TOP-SECRET-HOSTNAME" not in text
+    assert "before" in text and "after" in text